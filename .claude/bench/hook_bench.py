@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Hook latency benchmark.
+
+Replays hook payloads through every hook configured in the project's merged
+settings.json (base and expansion-pack hooks alike) and reports p50/p95/p99
+latency per hook and per event type, plus the wall time of the whole hook
+chain for one event (matching hooks run concurrently, as in Claude).
+
+Payloads come from the bundled synthetic corpus (.claude/bench/corpus.jsonl)
+or are exported from the events recorded in .claude/logs/trace.sqlite.
+
+Usage:
+    python3 .claude/bench/hook_bench.py                     # bundled corpus
+    python3 .claude/bench/hook_bench.py --trace             # recorded events
+    python3 .claude/bench/hook_bench.py --trace --export my-corpus.jsonl
+    python3 .claude/bench/hook_bench.py --json after.json --baseline before.json
+
+Hooks run for real, exactly as Claude would run them. By default they run in
+a throwaway sandbox: a clone of the project at HEAD (sharing its objects, so
+the checkout is as large as the real one) with the current .claude copied in
+(without logs or caches), which is also CLAUDE_PROJECT_DIR. The clone has its
+own refs, so the hooks' side effects (trace rows, checkpoint commits and
+branches) land there and are discarded, leaving the project's trace.sqlite
+and branches untouched.
+--live runs them in the project itself instead. Hooks that use absolute paths
+into the project still reach it, even in the sandbox.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shlex
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus.jsonl"
+DEFAULT_TRACE_DB = PROJECT_DIR / ".claude" / "logs" / "trace.sqlite"
+SETTINGS_FILES = (".claude/settings.json", ".claude/settings.local.json")
+
+BENCH_EVENTS = ("PreToolUse", "PostToolUse", "UserPromptSubmit")
+# Not copied into the sandbox: recorded data and regenerated caches
+SANDBOX_EXCLUDED = ("logs", ".tmp", "__pycache__")
+SANDBOX_GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "clauder-bench",
+    "GIT_AUTHOR_EMAIL": "clauder-bench@localhost",
+    "GIT_COMMITTER_NAME": "clauder-bench",
+    "GIT_COMMITTER_EMAIL": "clauder-bench@localhost",
+}
+# How python reports a script it cannot open: exit code 2, like a blocking hook
+PYTHON_LAUNCH_FAILURE = re.compile(rb"^\S*python[\d.]*: can't open file ", re.MULTILINE)
+# Events whose matcher is tested against the tool name; others ignore it
+MATCHER_EVENTS = ("PreToolUse", "PostToolUse")
+PERCENTILES = (50, 95, 99)
+DEFAULT_HOOK_TIMEOUT = 60
+
+# Candidate trace.sqlite columns, in order of preference
+EVENT_COLUMNS = ("hook_event_name", "event_type", "event_name", "event")
+PAYLOAD_COLUMNS = ("payload", "raw_payload", "hook_input", "input_data", "data", "raw")
+TOOL_INPUT_COLUMNS = ("tool_input", "input", "parameters", "arguments")
+TOOL_RESPONSE_COLUMNS = ("tool_response", "response", "output", "result")
+TOOL_COLUMNS = ("tool_name", "tool")
+PROMPT_COLUMNS = ("prompt", "user_prompt")
+SESSION_COLUMNS = ("session_id", "session")
+INTERNAL_TABLES = ("hook_timings",)
+
+
+def first_column(columns, candidates):
+    return next((c for c in candidates if c in columns), None)
+
+
+def normalize_event(value):
+    """Map recorded event names ("pre_tool_use", "PreToolUse", ...) to hook event names."""
+    key = re.sub(r"[^a-z]", "", str(value or "").lower())
+    for event in BENCH_EVENTS:
+        if event.lower() == key:
+            return event
+    return None
+
+
+def parse_json(value):
+    if isinstance(value, (bytes, str)):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+# Corpus
+
+def load_corpus(path):
+    payloads = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON ({e})")
+            if not isinstance(payload, dict) or not payload.get("hook_event_name"):
+                raise ValueError(f"{path}:{number}: missing hook_event_name")
+            payloads.append(payload)
+    return payloads
+
+
+def detect_trace_table(connection, table=None, payload_column=None):
+    tables = [
+        row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+        if row[0] not in INTERNAL_TABLES and not row[0].startswith("_")
+    ]
+    if table is not None:
+        if table not in tables:
+            raise ValueError(f"Table not found in trace database: {table}")
+        candidates = [table]
+    else:
+        candidates = tables
+
+    def columns_of(name):
+        return [row[1] for row in connection.execute(f'PRAGMA table_info("{name}")')]
+
+    best = None
+    for name in candidates:
+        columns = columns_of(name)
+        if payload_column is not None and payload_column not in columns:
+            continue
+        if first_column(columns, EVENT_COLUMNS) is None and payload_column is None:
+            continue
+        if payload_column is None and first_column(columns, PAYLOAD_COLUMNS + TOOL_INPUT_COLUMNS) is None:
+            continue
+        known = EVENT_COLUMNS + PAYLOAD_COLUMNS + TOOL_INPUT_COLUMNS + TOOL_COLUMNS + PROMPT_COLUMNS
+        score = sum(1 for c in columns if c in known)
+        if best is None or score > best[0]:
+            best = (score, name, columns)
+    if best is None:
+        raise ValueError("No table with recorded hook payloads found; use --table/--payload-column")
+    return best[1], best[2]
+
+
+def row_to_payload(row, columns, payload_column):
+    """Rebuild a hook payload from a recorded trace row."""
+    payload = parse_json(row[payload_column]) if payload_column else None
+    if isinstance(payload, dict) and payload.get("hook_event_name"):
+        return payload
+
+    def value(candidates):
+        column = first_column(columns, candidates)
+        return row[column] if column else None
+
+    event = normalize_event(value(EVENT_COLUMNS))
+    if event is None:
+        return None
+    rebuilt = {"session_id": value(SESSION_COLUMNS) or "bench", "hook_event_name": event}
+    if event == "UserPromptSubmit":
+        prompt = value(PROMPT_COLUMNS)
+        if prompt is None and isinstance(payload, str):
+            prompt = payload
+        rebuilt["prompt"] = prompt or ""
+        return rebuilt
+
+    tool_input = payload if isinstance(payload, dict) else parse_json(value(TOOL_INPUT_COLUMNS))
+    rebuilt["tool_name"] = value(TOOL_COLUMNS) or ""
+    rebuilt["tool_input"] = tool_input if isinstance(tool_input, dict) else {}
+    if event == "PostToolUse":
+        response = parse_json(value(TOOL_RESPONSE_COLUMNS))
+        rebuilt["tool_response"] = response if response is not None else {}
+    return rebuilt
+
+
+def export_from_trace(db_path, table=None, payload_column=None, limit=100):
+    """Return up to `limit` of the most recent payloads per benchmarked event type."""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        table, columns = detect_trace_table(connection, table, payload_column)
+        if payload_column is None:
+            payload_column = first_column(columns, PAYLOAD_COLUMNS)
+
+        counts = {event: 0 for event in BENCH_EVENTS}
+        payloads = []
+        for row in connection.execute(f'SELECT * FROM "{table}" ORDER BY rowid DESC'):
+            payload = row_to_payload(row, columns, payload_column)
+            if payload is None:
+                continue
+            event = normalize_event(payload.get("hook_event_name"))
+            if event is None or counts[event] >= limit:
+                continue
+            payload["hook_event_name"] = event
+            payloads.append(payload)
+            counts[event] += 1
+            if all(count >= limit for count in counts.values()):
+                break
+    finally:
+        connection.close()
+    payloads.reverse()
+    return payloads
+
+
+# Settings
+
+def load_hooks(project_dir, settings_paths=None):
+    """Merge the hooks of all settings files: {event: [(matcher, command, timeout)]}."""
+    if not settings_paths:
+        settings_paths = [project_dir / path for path in SETTINGS_FILES]
+        settings_paths = [path for path in settings_paths if path.exists()]
+        if not settings_paths:
+            raise ValueError("No .claude/settings.json found; run clauder_activate or pass --settings")
+
+    hooks = {}
+    for path in settings_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        for event, groups in (settings.get("hooks") or {}).items():
+            for group in groups or []:
+                matcher = group.get("matcher", "")
+                for hook in group.get("hooks", []):
+                    if hook.get("type") == "command" and hook.get("command"):
+                        timeout = hook.get("timeout", DEFAULT_HOOK_TIMEOUT)
+                        hooks.setdefault(event, []).append((matcher, hook["command"], timeout))
+    return hooks
+
+
+def matcher_applies(event, matcher, tool_name):
+    if event not in MATCHER_EVENTS or matcher in ("", "*"):
+        return True
+    try:
+        return re.fullmatch(matcher, tool_name or "") is not None
+    except re.error:
+        return matcher == tool_name
+
+
+def hook_label(command):
+    """Short name for a hook command: its script path when there is one."""
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return command
+    scripts = [t for t in tokens if t.endswith((".py", ".sh"))]
+    return scripts[-1] if scripts else command
+
+
+# Sandbox
+
+def create_sandbox(project_dir):
+    """
+    Clone the project into a scratch directory, copy the current .claude over
+    it and return its path.
+
+    `git clone --shared` borrows the project's objects instead of copying them
+    but keeps its own refs. A project without commits gets an empty repository.
+    """
+    sandbox = Path(tempfile.mkdtemp(prefix="clauder-bench-"))
+    try:
+        env = dict(os.environ)
+        env.update(SANDBOX_GIT_IDENTITY)
+
+        def git(*args, cwd=sandbox):
+            subprocess.run(["git", *args], cwd=cwd, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        try:
+            git("rev-parse", "--verify", "--quiet", "HEAD", cwd=project_dir)
+            git("clone", "--quiet", "--shared", str(project_dir), str(sandbox))
+        except subprocess.CalledProcessError:
+            git("init", "-q")
+        shutil.copytree(project_dir / ".claude", sandbox / ".claude", symlinks=True, dirs_exist_ok=True,
+                        ignore=lambda directory, names: [n for n in names if n in SANDBOX_EXCLUDED])
+        (sandbox / ".claude" / "logs").mkdir(exist_ok=True)
+        git("add", "-A")
+        git("commit", "-q", "--allow-empty", "-m", "Sandbox")
+    except BaseException:
+        shutil.rmtree(sandbox, ignore_errors=True)
+        raise
+    return sandbox
+
+
+# Replay
+
+def run_hook(command, data, project_dir, env, timeout):
+    """Run a hook and return (wall time in ms, exit code or None on timeout, stderr)."""
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            command, shell=True, cwd=project_dir, env=env, input=data,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout,
+        )
+        exit_code, stderr = result.returncode, result.stderr
+    except subprocess.TimeoutExpired:
+        exit_code, stderr = None, b""
+    return (time.perf_counter() - started) * 1000, exit_code, stderr
+
+
+def missing_script(command, project_dir):
+    """Return the hook's script path if it does not exist, else None."""
+    script = hook_label(command)
+    if script == command:
+        return None
+    for variable in ("${CLAUDE_PROJECT_DIR}", "$CLAUDE_PROJECT_DIR"):
+        script = script.replace(variable, str(project_dir))
+    return None if (project_dir / script).exists() else script
+
+
+def outcome(exit_code, stderr, missing):
+    """Classify a run as None (allowed), "blocked" or "errors"."""
+    if missing or exit_code is None or PYTHON_LAUNCH_FAILURE.search(stderr):
+        return "errors"
+    if exit_code == 2:
+        return "blocked"
+    return "errors" if exit_code != 0 else None
+
+
+def run_chain(chain, data, project_dir, env, pool):
+    """Run all hooks of a chain concurrently, as Claude does, and return the wall time."""
+    started = time.perf_counter()
+    futures = [pool.submit(run_hook, command, data, project_dir, env, timeout) for command, timeout in chain]
+    for future in futures:
+        future.result()
+    return (time.perf_counter() - started) * 1000
+
+
+def replay(payloads, hooks, project_dir, repeat=3, warmup=1, hook_filter=None):
+    """
+    Replay every payload through its hook chain.
+
+    Each hook is timed on its own, then the whole chain is timed running
+    concurrently. Returns (per_hook, per_chain): per_hook maps (event, hook)
+    to {"samples": [ms], "blocked": n, "errors": n}; per_chain maps event to
+    the chain wall times. Exit code 2 counts as blocked, unless the hook's
+    script is missing or could not be started.
+    """
+    env = dict(os.environ)
+    # Benchmark runs are not recorded as live hook timings
+    env.update({"CLAUDE_PROJECT_DIR": str(project_dir), "CLAUDER_HOOK_TIMING": "0"})
+
+    per_hook = {}
+    per_chain = {}
+    warned = set()
+    pool = ThreadPoolExecutor(max_workers=8)
+    for payload in payloads:
+        event = payload["hook_event_name"]
+        payload = dict(payload)
+        payload.setdefault("session_id", "bench")
+        payload.setdefault("cwd", str(project_dir))
+        data = json.dumps(payload).encode("utf-8")
+
+        chain = {}
+        for matcher, command, timeout in hooks.get(event, []):
+            # Identical commands matched by several groups run once
+            if matcher_applies(event, matcher, payload.get("tool_name")) and command not in chain:
+                if hook_filter is None or hook_filter in command:
+                    chain[command] = timeout
+        chain = list(chain.items())
+        if not chain:
+            continue
+        missing = {command: missing_script(command, project_dir) for command, _ in chain}
+        for command, script in missing.items():
+            if script is not None and command not in warned:
+                warned.add(command)
+                print(f"Warning: hook script not found: {script}", file=sys.stderr)
+
+        for _ in range(warmup):
+            for command, timeout in chain:
+                run_hook(command, data, project_dir, env, timeout)
+
+        for _ in range(repeat):
+            for command, timeout in chain:
+                elapsed, exit_code, stderr = run_hook(command, data, project_dir, env, timeout)
+                stats = per_hook.setdefault((event, hook_label(command)), {"samples": [], "blocked": 0, "errors": 0})
+                stats["samples"].append(elapsed)
+                result = outcome(exit_code, stderr, missing[command])
+                if result is not None:
+                    stats[result] += 1
+            per_chain.setdefault(event, []).append(run_chain(chain, data, project_dir, env, pool))
+    pool.shutdown()
+    return per_hook, per_chain
+
+
+# Report
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    summary = {"n": len(samples)}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = round(percentile(samples, p), 3)
+    summary["max"] = round(max(samples), 3)
+    return summary
+
+
+def build_report(per_hook, per_chain, source, repeat):
+    hooks = []
+    for (event, hook), stats in sorted(per_hook.items()):
+        entry = {"event": event, "hook": hook}
+        entry.update(summarize(stats["samples"]))
+        entry["blocked"] = stats["blocked"]
+        entry["errors"] = stats["errors"]
+        hooks.append(entry)
+    chains = []
+    for event, samples in sorted(per_chain.items()):
+        entry = {"event": event}
+        entry.update(summarize(samples))
+        chains.append(entry)
+    return {"source": source, "repeat": repeat, "hooks": hooks, "chains": chains}
+
+
+def delta(current, baseline, key):
+    if not baseline or not baseline.get(key):
+        return ""
+    change = (current[key] - baseline[key]) / baseline[key] * 100
+    return f"{change:+.0f}%"
+
+
+def print_report(report, baseline=None):
+    baseline_hooks = {}
+    baseline_chains = {}
+    if baseline:
+        baseline_hooks = {(h["event"], h["hook"]): h for h in baseline.get("hooks", [])}
+        baseline_chains = {c["event"]: c for c in baseline.get("chains", [])}
+
+    columns = "".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+    compare = f"{'Δp50':>7}{'Δp95':>7}" if baseline else ""
+    print(f"Hook latency in ms ({report['source']}, {report['repeat']} run(s) per payload)")
+    print()
+    print(f"{'Event':<18}{'Hook':<46}{'n':>6}{columns}{'max':>9}{'blocked':>9}{'errors':>8}{compare}")
+    for entry in report["hooks"]:
+        previous = baseline_hooks.get((entry["event"], entry["hook"]))
+        values = "".join(f"{entry[f'p{p}']:>9.1f}" for p in PERCENTILES)
+        changes = f"{delta(entry, previous, 'p50'):>7}{delta(entry, previous, 'p95'):>7}" if baseline else ""
+        print(f"{entry['event']:<18}{entry['hook'][-45:]:<46}{entry['n']:>6}{values}"
+              f"{entry['max']:>9.1f}{entry['blocked']:>9}{entry['errors']:>8}{changes}")
+    print()
+    print("Whole hook chain per event (matching hooks run concurrently)")
+    for entry in report["chains"]:
+        previous = baseline_chains.get(entry["event"])
+        values = "".join(f"{entry[f'p{p}']:>9.1f}" for p in PERCENTILES)
+        changes = f"{delta(entry, previous, 'p50'):>7}{delta(entry, previous, 'p95'):>7}" if baseline else ""
+        print(f"{entry['event']:<18}{'':<46}{entry['n']:>6}{values}{entry['max']:>9.1f}{'':>17}{changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the latency of the configured hooks")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS,
+                        help="JSONL file of hook payloads (default: the bundled synthetic corpus)")
+    parser.add_argument("--trace", type=Path, nargs="?", const=DEFAULT_TRACE_DB,
+                        help="export payloads from a trace database (default: .claude/logs/trace.sqlite)")
+    parser.add_argument("--table", help="trace table holding the recorded events")
+    parser.add_argument("--payload-column", help="trace column holding the hook payload or tool input")
+    parser.add_argument("--limit", type=int, default=100,
+                        help="most recent payloads exported per event type (default: 100)")
+    parser.add_argument("--export", type=Path, help="write the payloads to a JSONL corpus and exit")
+    parser.add_argument("--settings", type=Path, action="append",
+                        help="settings file to read hooks from (repeatable; default: .claude/settings.json)")
+    parser.add_argument("--hook", help="only benchmark hooks whose command contains this string")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per payload (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per payload (default: 1)")
+    parser.add_argument("--live", action="store_true",
+                        help="run the hooks in the project itself instead of a sandbox copy")
+    parser.add_argument("--json", type=Path, help="also write the report as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON report to compare against")
+    args = parser.parse_args()
+
+    try:
+        if args.trace is not None:
+            if not args.trace.exists():
+                raise ValueError(f"Trace database not found: {args.trace}")
+            payloads = export_from_trace(args.trace, args.table, args.payload_column, args.limit)
+            source = str(args.trace)
+        else:
+            payloads = load_corpus(args.corpus)
+            source = str(args.corpus)
+        if not payloads:
+            raise ValueError(f"No payloads found in {source}")
+
+        if args.export is not None:
+            with open(args.export, "w", encoding="utf-8") as f:
+                for payload in payloads:
+                    f.write(json.dumps(payload, default=str) + "\n")
+            print(f"Exported {len(payloads)} payloads to {args.export}")
+            return 0
+
+        settings = [path.resolve() for path in args.settings] if args.settings else None
+        project_dir = PROJECT_DIR if args.live else create_sandbox(PROJECT_DIR)
+        baseline = None
+        if args.baseline is not None:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+    except (OSError, ValueError, sqlite3.Error, subprocess.CalledProcessError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        hooks = load_hooks(project_dir, settings)
+        per_hook, per_chain = replay(payloads, hooks, project_dir, max(args.repeat, 1),
+                                     max(args.warmup, 0), args.hook)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if not args.live:
+            shutil.rmtree(project_dir, ignore_errors=True)
+    if not per_hook:
+        print("No configured hook matched the payloads", file=sys.stderr)
+        return 1
+
+    report = build_report(per_hook, per_chain, source, max(args.repeat, 1))
+    print_report(report, baseline)
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
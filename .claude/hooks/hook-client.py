@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Client stub for the resident hook server; see utils/hook_client.py.
+
+Usage (in settings.json, once the hook server is enabled):
+    python3 -S .claude/hooks/hook-client.py .claude/hooks/<hook>.py [args...]
+"""
+
+import sys
+
+from utils.hook_client import main
+
+sys.exit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Resident hook server for clauder.
+
+Keeps a warm Python process listening on a Unix socket so that hook commands
+routed through hook-client.py do not pay interpreter startup, module imports
+and hook compilation on every tool call.
+
+Each request is served in a forked child: the hook runs with the caller's
+argv, cwd, environment and stdin, exactly as if it had been started with
+`python3 <hook>`, and its exit code, stdout and stderr are sent back to the
+client. Forking keeps hooks isolated from each other (sys.exit, globals,
+file descriptors) while sharing everything the parent has already loaded:
+modules, compiled hooks, the pattern matchers and preferences.json. No
+SQLite connection is opened in the parent, so none is shared across forks.
+
+Children are forked ahead of time and wait in accept(), each serving a single
+request before exiting; the parent replaces them as they are used, so the
+cost of fork() is not paid while a hook call is waiting.
+
+Usage:
+    python3 .claude/hooks/hook-server.py serve    # run in foreground
+    python3 .claude/hooks/hook-server.py stop     # stop a running server
+    python3 .claude/hooks/hook-server.py status   # exit 0 if running
+    python3 .claude/hooks/hook-server.py path     # print the socket path
+
+clauder.sh exports the socket path as CLAUDER_HOOK_SOCKET for hook-client.py;
+utils/hook_client.py documents the wire format.
+"""
+
+import hashlib
+import os
+import select
+import signal
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import traceback
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = HOOKS_DIR.parent.parent
+
+# Modules commonly imported by clauder hooks, loaded once in the parent
+PRELOAD_MODULES = (
+    "datetime", "fnmatch", "glob", "hashlib", "json", "pathlib", "re",
+    "shlex", "sqlite3", "subprocess", "time", "uuid",
+)
+
+# Idle children waiting for a request; Claude Code runs a tool call's hooks in parallel
+PREFORK_WORKERS = 4
+# How often an idle child checks that the server that forked it is still alive
+ORPHAN_CHECK_INTERVAL = 1.0
+
+HEADER = struct.Struct("!I")
+
+
+def socket_dir(project_dir=PROJECT_DIR):
+    """$XDG_RUNTIME_DIR/clauder when available, otherwise the project's .claude/.tmp."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / "clauder"
+    return Path(project_dir) / ".claude" / ".tmp" / "hook-server"
+
+
+def socket_path(project_dir=PROJECT_DIR):
+    """Return the per-project socket path."""
+    digest = hashlib.sha1(str(project_dir).encode("utf-8")).hexdigest()[:16]
+    return socket_dir(project_dir) / f"hooks-{digest}.sock"
+
+
+def private_dir(path):
+    """Create `path` for the current user only, refusing one controlled by someone else."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a directory owned by the current user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        os.chmod(path, 0o700)
+
+
+def pid_path(project_dir=PROJECT_DIR):
+    return socket_path(project_dir).with_suffix(".pid")
+
+
+def send_frame(sock, data):
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_frame(sock):
+    (size,) = HEADER.unpack(recv_exact(sock, HEADER.size))
+    return recv_exact(sock, size)
+
+
+class CodeCache:
+    """Compiled hook code, keyed by path and invalidated on file change."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, path):
+        info = os.stat(path)
+        key = (info.st_mtime_ns, info.st_size)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != key:
+            with open(path, "rb") as f:
+                code = compile(f.read(), path, "exec")
+            entry = (key, code)
+            self._entries[path] = entry
+        return entry[1]
+
+    def warm(self, directory):
+        for script in sorted(Path(directory).glob("*.py")):
+            try:
+                self.get(str(script))
+            except (OSError, SyntaxError):
+                continue
+
+
+def preload():
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+
+    # Hook utility modules are imported as `utils.<name>` with the hooks
+    # directory on sys.path; importing them here lets every child reuse them.
+    sys.path.insert(0, str(HOOKS_DIR))
+    try:
+        for module in sorted((HOOKS_DIR / "utils").glob("*.py")):
+            if module.stem != "__init__":
+                try:
+                    __import__(f"utils.{module.stem}")
+                except Exception:
+                    continue
+
+        # Build the .ignore/.immutable/.exclude_security_checks matchers once;
+        # children inherit them and only re-stat the pattern files.
+        try:
+            from utils.pattern_matcher import exclusion_matcher, ignore_matcher, immutable_matcher
+            for build in (ignore_matcher, immutable_matcher, exclusion_matcher):
+                build(PROJECT_DIR)
+        except Exception:
+            pass
+        try:
+            from utils.preferences import load_preferences
+            load_preferences(PROJECT_DIR)
+        except Exception:
+            pass
+    finally:
+        sys.path.remove(str(HOOKS_DIR))
+
+
+def run_hook(code, script, argv, stdin_data):
+    """Run a hook in the current (forked) process and return its exit code."""
+    fds = []
+    for data in (stdin_data, b"", b""):
+        fd, tmp = tempfile.mkstemp(prefix="clauder-hook-")
+        os.unlink(tmp)
+        os.write(fd, data)
+        os.lseek(fd, 0, os.SEEK_SET)
+        fds.append(fd)
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+
+    sys.argv = [script] + list(argv)
+    sys.path.insert(0, os.path.dirname(script))
+    namespace = {"__name__": "__main__", "__file__": script, "__builtins__": __builtins__}
+
+    exit_code = 0
+    try:
+        exec(code, namespace)
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+
+    outputs = []
+    for fd in fds[1:]:
+        os.lseek(fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        outputs.append(b"".join(chunks))
+    return exit_code, outputs[0], outputs[1]
+
+
+class HookRequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        try:
+            request = recv_frame(self.request).split(b"\0")
+            env = recv_frame(self.request)
+            stdin_data = recv_frame(self.request)
+        except (ConnectionError, ValueError):
+            return
+        if len(request) < 2:
+            return
+
+        script = os.path.realpath(os.fsdecode(request[0]))
+        try:
+            code = self.server.code_cache.get(script)
+        except (OSError, SyntaxError) as e:
+            self.respond(1, b"", f"hook-server: cannot load {script}: {e}\n".encode())
+            return
+
+        os.chdir(os.fsdecode(request[1]) or str(PROJECT_DIR))
+        os.environ.clear()
+        for entry in env.split(b"\0"):
+            key, separator, value = entry.partition(b"=")
+            if separator:
+                os.environb[key] = value
+        argv = [os.fsdecode(arg) for arg in request[2:]]
+        exit_code, stdout, stderr = run_hook(code, script, argv, stdin_data)
+        self.respond(exit_code, stdout, stderr)
+
+    def respond(self, exit_code, stdout, stderr):
+        try:
+            send_frame(self.request, str(exit_code).encode())
+            send_frame(self.request, stdout)
+            send_frame(self.request, stderr)
+        except OSError:
+            pass
+
+
+class HookServer(socketserver.UnixStreamServer):
+    allow_reuse_address = True
+
+    def __init__(self, path):
+        self.code_cache = CodeCache()
+        self.workers = set()
+        super().__init__(str(path), HookRequestHandler)
+        # Idle children share the listening socket and all poll it
+        self.socket.setblocking(False)
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+        exit_code = 0
+        try:
+            for signum in (signal.SIGTERM, signal.SIGHUP, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            request = self.accept_one(os.getppid())
+            if request is not None:
+                request.setblocking(True)
+                try:
+                    self.finish_request(request, "")
+                finally:
+                    self.shutdown_request(request)
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def accept_one(self, parent):
+        """Wait for one connection; give up if the server that forked us is gone."""
+        while True:
+            ready, _, _ = select.select([self.socket], [], [], ORPHAN_CHECK_INTERVAL)
+            if os.getppid() != parent:
+                return None
+            if not ready:
+                continue
+            try:
+                request, _ = self.socket.accept()
+                return request
+            except (BlockingIOError, InterruptedError):
+                # Another idle child took it
+                continue
+
+    def serve_prefork(self, workers=PREFORK_WORKERS):
+        for _ in range(workers):
+            self.spawn_worker()
+        while True:
+            pid, _ = os.wait()
+            if pid in self.workers:
+                self.workers.discard(pid)
+                self.spawn_worker()
+
+    def stop_workers(self):
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        for pid in self.workers:
+            try:
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        self.workers.clear()
+
+
+def read_pid():
+    try:
+        return int(pid_path().read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def is_running(pid):
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def serve():
+    path = socket_path()
+    try:
+        private_dir(path.parent)
+    except OSError as e:
+        print(f"hook-server: {e}", file=sys.stderr)
+        return 1
+
+    if is_running(read_pid()):
+        print("hook-server: already running", file=sys.stderr)
+        return 0
+    if path.exists():
+        path.unlink()
+
+    preload()
+    # The socket is created owner-only; clients refuse any other mode
+    previous_umask = os.umask(0o077)
+    try:
+        server = HookServer(path)
+    finally:
+        os.umask(previous_umask)
+    server.code_cache.warm(HOOKS_DIR)
+    pid_path().write_text(str(os.getpid()))
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGHUP, shutdown)
+    try:
+        server.serve_prefork()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop_workers()
+        server.server_close()
+        for stale in (path, pid_path()):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    return 0
+
+
+def stop():
+    pid = read_pid()
+    if not is_running(pid):
+        return 0
+    os.kill(pid, signal.SIGTERM)
+    return 0
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if command == "serve":
+        return serve()
+    if command == "stop":
+        return stop()
+    if command == "status":
+        return 0 if is_running(read_pid()) else 1
+    if command == "path":
+        print(socket_path())
+        return 0
+    print(__doc__.strip(), file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
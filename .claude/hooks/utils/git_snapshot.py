@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Low-overhead git checkpoints.
+
+Snapshots of the working tree are built with a private index
+(.git/clauder/checkpoint.index) that is kept between prompts, so git only
+rehashes files whose stat data changed. Snapshots are committed under
+refs/clauder/checkpoints instead of on the working branch, leaving the
+user's index, HEAD and branches untouched. When the tree matches the
+previous checkpoint, no commit is created.
+
+Usage:
+    python3 .claude/hooks/utils/git_snapshot.py create [message]
+    python3 .claude/hooks/utils/git_snapshot.py list [count]
+    python3 .claude/hooks/utils/git_snapshot.py diff <checkpoint> [<checkpoint>]
+    python3 .claude/hooks/utils/git_snapshot.py restore <checkpoint>
+
+Checkpoints can be referenced by commit id or by position, `@0` being the
+latest, `@1` the one before, and so on.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+CHECKPOINT_REF = "refs/clauder/checkpoints"
+CHECKPOINT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "clauder",
+    "GIT_AUTHOR_EMAIL": "clauder@localhost",
+    "GIT_COMMITTER_NAME": "clauder",
+    "GIT_COMMITTER_EMAIL": "clauder@localhost",
+}
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def git(args, cwd=".", env=None, check=True, capture=True):
+    result = subprocess.run(
+        ["git"] + list(args),
+        cwd=cwd,
+        env=env,
+        capture_output=capture,
+        text=True,
+    )
+    if check and result.returncode != 0:
+        message = (result.stderr or "").strip() if capture else ""
+        raise CheckpointError(message or f"git {' '.join(args)} failed")
+    return result.stdout.strip() if capture else ""
+
+
+def git_dir(cwd="."):
+    return git(["rev-parse", "--absolute-git-dir"], cwd=cwd)
+
+
+def top_level(cwd="."):
+    return git(["rev-parse", "--show-toplevel"], cwd=cwd)
+
+
+def private_index_env(cwd=".", index_name="checkpoint.index"):
+    """Environment using the private checkpoint index, seeded from the real index."""
+    directory = os.path.join(git_dir(cwd), "clauder")
+    os.makedirs(directory, exist_ok=True)
+    index_path = os.path.join(directory, index_name)
+    if not os.path.exists(index_path):
+        real_index = os.path.join(git_dir(cwd), "index")
+        if os.path.exists(real_index):
+            # Reuse the real index's stat cache for the first snapshot
+            shutil.copyfile(real_index, index_path)
+    env = dict(os.environ)
+    env["GIT_INDEX_FILE"] = index_path
+    return env
+
+
+def latest_checkpoint(cwd="."):
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"{CHECKPOINT_REF}^{{commit}}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def snapshot_tree(cwd="."):
+    """Write the current working tree (respecting .gitignore) as a tree object."""
+    root = top_level(cwd)
+    env = private_index_env(root)
+    git(["add", "-A", "--", "."], cwd=root, env=env)
+    return git(["write-tree"], cwd=root, env=env)
+
+
+def create_checkpoint(message="Checkpoint", cwd="."):
+    """Create a checkpoint commit. Returns its id, or None if nothing changed."""
+    root = top_level(cwd)
+    tree = snapshot_tree(root)
+    parent = latest_checkpoint(root)
+    if parent and git(["rev-parse", f"{parent}^{{tree}}"], cwd=root) == tree:
+        return None
+
+    head = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", "HEAD"], cwd=root, capture_output=True, text=True
+    ).stdout.strip()
+    body = f"{message}\n\nBase: {head}\n" if head else f"{message}\n"
+
+    env = dict(os.environ)
+    env.update(CHECKPOINT_IDENTITY)
+    args = ["commit-tree", tree, "-m", body]
+    if parent:
+        args[2:2] = ["-p", parent]
+    commit = git(args, cwd=root, env=env)
+    git(["update-ref", "-m", message, CHECKPOINT_REF, commit] + ([parent] if parent else [""]), cwd=root)
+    return commit
+
+
+def list_checkpoints(count=20, cwd="."):
+    """Return [(commit, timestamp, subject)] from newest to oldest."""
+    if latest_checkpoint(cwd) is None:
+        return []
+    output = git(["log", f"-n{count}", "--format=%H%x09%ci%x09%s", CHECKPOINT_REF], cwd=cwd)
+    return [tuple(line.split("\t", 2)) for line in output.splitlines() if line]
+
+
+def resolve(checkpoint, cwd="."):
+    if checkpoint.startswith("@") and checkpoint[1:].isdigit():
+        checkpoint = f"{CHECKPOINT_REF}~{checkpoint[1:]}"
+    try:
+        return git(["rev-parse", "--verify", f"{checkpoint}^{{commit}}"], cwd=cwd)
+    except CheckpointError:
+        raise CheckpointError(f"Unknown checkpoint: {checkpoint}")
+
+
+def diff_checkpoints(first, second=None, cwd="."):
+    """Diff two checkpoints, or a checkpoint against the current working tree."""
+    root = top_level(cwd)
+    old = resolve(first, root)
+    new = resolve(second, root) if second else snapshot_tree(root)
+    git(["diff", "--stat", "-p", old, new], cwd=root, check=True, capture=False)
+
+
+def restore_checkpoint(checkpoint, cwd="."):
+    """
+    Restore the working tree to a checkpoint, without touching the real index
+    or HEAD. The current state is checkpointed first, so a restore can itself
+    be undone.
+    """
+    root = top_level(cwd)
+    target = resolve(checkpoint, root)
+    create_checkpoint(f"Before restoring {target[:12]}", root)
+    current_tree = snapshot_tree(root)
+
+    # Only touch the paths that differ between the current state and the target
+    changes = git(["diff", "--name-status", "--no-renames", "-z", current_tree, target], cwd=root)
+    fields = [field for field in changes.split("\0") if field]
+    to_remove = []
+    to_checkout = []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        (to_remove if status == "D" else to_checkout).append(path)
+
+    for path in to_remove:
+        try:
+            os.remove(os.path.join(root, path))
+        except OSError:
+            pass
+
+    if to_checkout:
+        env = private_index_env(root, "restore.index")
+        git(["read-tree", target], cwd=root, env=env)
+        subprocess.run(
+            ["git", "checkout-index", "-f", "-z", "--stdin"],
+            cwd=root, env=env, input="\0".join(to_checkout), text=True, check=True,
+            capture_output=True,
+        )
+    return target
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    args = sys.argv[2:]
+    try:
+        if command == "create":
+            commit = create_checkpoint(" ".join(args) or "Checkpoint")
+            print(commit[:12] if commit else "No changes since the last checkpoint")
+        elif command == "list":
+            checkpoints = list_checkpoints(int(args[0]) if args else 20)
+            if not checkpoints:
+                print("No checkpoints")
+            for index, (commit, timestamp, subject) in enumerate(checkpoints):
+                print(f"@{index:<3} {commit[:12]}  {timestamp}  {subject}")
+        elif command == "diff" and args:
+            diff_checkpoints(args[0], args[1] if len(args) > 1 else None)
+        elif command == "restore" and args:
+            target = restore_checkpoint(args[0])
+            print(f"Restored working tree to checkpoint {target[:12]}")
+        else:
+            print(__doc__.strip(), file=sys.stderr)
+            return 2
+    except CheckpointError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
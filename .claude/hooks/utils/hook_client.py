@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Client stub for the resident hook server, run through .claude/hooks/hook-client.py.
+
+Usage (in settings.json, once the hook server is enabled):
+    python3 -S .claude/hooks/hook-client.py .claude/hooks/<hook>.py [args...]
+
+Forwards the hook's argv, cwd, environment and stdin to hook-server.py and
+replays its stdout, stderr and exit code. clauder.sh advertises the server's
+socket in CLAUDER_HOOK_SOCKET; without it, or when the server is not running,
+the hook script is executed directly, so the stub is always safe to use.
+
+This runs before every routed hook, so keep it cheap: it runs with `-S` to
+skip site imports and only uses the C-level `_socket` module, and only when a
+server is advertised (`import socket` alone pulls in enum and selectors, which
+costs about as much as interpreter startup). It lives in a module rather than
+in hook-client.py itself because Python recompiles the script it is started
+with on every run, while an imported module is loaded from cached bytecode.
+
+Wire format (each frame is a 4-byte big-endian length followed by the data):
+    request:  script NUL cwd [NUL arg...] | env as NUL-separated KEY=VALUE | stdin
+    response: exit code as ASCII digits | stdout | stderr
+
+With CLAUDER_HOOK_TIMING=1, the wall time of each hook is recorded in the
+`hook_timings` table of trace.sqlite (through the trace spool when enabled),
+with or without the server; clauder_activate routes hooks through this stub
+while hook timing is enabled.
+"""
+
+import os
+import sys
+
+
+def trusted(path):
+    """Only talk to a socket in a private directory, both owned by the current user."""
+    import stat
+    try:
+        directory = os.lstat(os.path.dirname(path))
+        sock = os.lstat(path)
+    except OSError:
+        return False
+    uid = os.getuid()
+    return (
+        stat.S_ISDIR(directory.st_mode) and directory.st_uid == uid
+        and stat.S_IMODE(directory.st_mode) == 0o700
+        and stat.S_ISSOCK(sock.st_mode) and sock.st_uid == uid
+        and stat.S_IMODE(sock.st_mode) & 0o077 == 0
+    )
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock, data):
+    sock.sendall(len(data).to_bytes(4, "big") + data)
+
+
+def recv_frame(sock):
+    return recv_exact(sock, int.from_bytes(recv_exact(sock, 4), "big"))
+
+
+def run_direct(script, argv, stdin_data=None):
+    """Run the hook in a fresh interpreter, as settings.json used to."""
+    command = [sys.executable, script] + argv
+    if stdin_data is None:
+        os.execv(sys.executable, command)
+
+    import subprocess
+    result = subprocess.run(command, input=stdin_data)
+    return result.returncode
+
+
+def record_timing(script, stdin_data, started, exit_code, mode):
+    """Record the hook's wall time; never lets a logging failure affect the hook."""
+    import json
+    import time
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    try:
+        payload = json.loads(stdin_data) if stdin_data else {}
+        if not isinstance(payload, dict):
+            payload = {}
+    except ValueError:
+        payload = {}
+    project_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+    hook = os.path.relpath(os.path.abspath(script), project_dir)
+    row = {
+        # UTC, so the tracer can bucket timings with SQLite's strftime('%s')
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "hook": hook,
+        "event_type": payload.get("hook_event_name"),
+        "tool_name": payload.get("tool_name"),
+        "session_id": payload.get("session_id"),
+        "duration_ms": round(duration_ms, 3),
+        "exit_code": exit_code,
+        "mode": mode,
+    }
+    try:
+        from utils.trace_spool import record_event
+        record_event("hook_timings", row)
+    except Exception:
+        pass
+
+
+def run(script, argv):
+    """Run the hook through the server, or directly. Returns (exit_code, stdin, mode)."""
+
+    def direct():
+        if os.environ.get("CLAUDER_HOOK_TIMING") != "1":
+            return run_direct(script, argv), None, "direct"
+        # Timed runs need to come back here, so the hook can't replace this process
+        stdin_data = sys.stdin.buffer.read()
+        return run_direct(script, argv, stdin_data), stdin_data, "direct"
+
+    path = os.environ.get("CLAUDER_HOOK_SOCKET")
+    if not path or os.environ.get("CLAUDER_HOOK_SERVER") == "0" or not trusted(path):
+        return direct()
+
+    import _socket
+
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return direct()
+
+    stdin_data = sys.stdin.buffer.read()
+    request = b"\0".join(os.fsencode(part) for part in [os.path.abspath(script), os.getcwd()] + argv)
+    env = b"\0".join(os.fsencode(key) + b"=" + os.fsencode(value) for key, value in os.environ.items())
+    sent = False
+    try:
+        for frame in (request, env, stdin_data):
+            send_frame(sock, frame)
+        sent = True
+        exit_code = int(recv_frame(sock))
+        stdout = recv_frame(sock)
+        stderr = recv_frame(sock)
+    except (OSError, ValueError) as e:
+        if not sent:
+            # The server never received the whole request, so the hook has not run
+            return run_direct(script, argv, stdin_data), stdin_data, "direct"
+        # The hook may already have run (and had side effects): don't run it twice
+        print(f"hook-client: hook server failed while running {script}: {e}", file=sys.stderr)
+        return 1, stdin_data, "server"
+    finally:
+        sock.close()
+
+    sys.stdout.buffer.write(stdout)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(stderr)
+    sys.stderr.flush()
+    return exit_code, stdin_data, "server"
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: hook-client.py <hook-script> [args...]", file=sys.stderr)
+        return 1
+
+    timing = os.environ.get("CLAUDER_HOOK_TIMING") == "1"
+    if timing:
+        import time
+        started = time.perf_counter()
+    script = sys.argv[1]
+    exit_code, stdin_data, mode = run(script, sys.argv[2:])
+    if timing:
+        record_timing(script, stdin_data, started, exit_code, mode)
+    return exit_code
+
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Compiled matchers for .ignore, .immutable and .exclude_security_checks.
+
+The merged pattern lists can hold hundreds of entries once several expansion
+packs are applied. Instead of testing a path against each entry in turn, the
+entries are compiled once into a single structure:
+
+- "contains" mode (.ignore, .immutable: inclusion only, no pattern matching):
+  all entries go into one Aho-Corasick automaton, so a path is scanned once
+  regardless of how many entries there are.
+- "glob" mode (.exclude_security_checks): literal entries go into a
+  path-segment trie, glob entries are joined into one combined regex.
+
+The compiled tables are stored as JSON in .claude/.tmp/matchers/ (never
+pickled, so a tampered cache cannot run code) and rebuilt whenever one of the
+source files changes (mtime or size). A cache file is only read if it is owned
+by the current user and not writable by anyone else. Within a process, such as
+the resident hook server, matchers are also kept in memory.
+
+Usage:
+    from utils.pattern_matcher import ignore_matcher
+
+    pattern = ignore_matcher(project_dir).match(file_path)
+    if pattern is not None:
+        ...  # blocked by `pattern`
+"""
+
+import fnmatch
+import json
+import os
+import re
+from pathlib import Path
+
+MATCHER_FORMAT = 2
+CACHE_DIR = os.path.join(".claude", ".tmp", "matchers")
+GLOB_CHARS = frozenset("*?[")
+
+
+def read_patterns(path):
+    """Return the non-empty, non-comment entries of a pattern file."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    patterns = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            patterns.append(line)
+    return patterns
+
+
+def normalize_path(path, project_dir=None):
+    path = str(path).replace(os.sep, "/")
+    if project_dir is not None and os.path.isabs(path):
+        root = str(project_dir).replace(os.sep, "/").rstrip("/") + "/"
+        if path.startswith(root):
+            path = path[len(root):]
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+class SubstringAutomaton:
+    """Aho-Corasick automaton reporting the first entry contained in a string."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        for pattern in patterns:
+            self._add(pattern)
+        self._link()
+
+    def _add(self, pattern):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            node = next_node
+        if self.output[node] is None:
+            self.output[node] = pattern
+
+    def to_state(self):
+        return {"goto": self.goto, "fail": self.fail, "output": self.output}
+
+    @classmethod
+    def from_state(cls, state):
+        automaton = cls.__new__(cls)
+        automaton.goto, automaton.fail, automaton.output = state["goto"], state["fail"], state["output"]
+        return automaton
+
+    def _link(self):
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                fallback = self.goto[state].get(char, 0)
+                self.fail[child] = fallback if fallback != child else 0
+                if self.output[child] is None:
+                    self.output[child] = self.output[self.fail[child]]
+                queue.append(child)
+
+    def search(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node] is not None:
+                return output[node]
+        return None
+
+
+class SegmentTrie:
+    """Literal path entries, matched against path prefixes or any single segment."""
+
+    END = "\0"
+
+    def __init__(self, patterns):
+        self.root = {}
+        self.names = {}
+        for pattern in patterns:
+            segments = [s for s in pattern.strip("/").split("/") if s and s != "."]
+            if not segments:
+                continue
+            if len(segments) == 1:
+                self.names.setdefault(segments[0], pattern)
+            node = self.root
+            for segment in segments:
+                node = node.setdefault(segment, {})
+            node.setdefault(self.END, pattern)
+
+    def to_state(self):
+        return {"root": self.root, "names": self.names}
+
+    @classmethod
+    def from_state(cls, state):
+        trie = cls.__new__(cls)
+        trie.root, trie.names = state["root"], state["names"]
+        return trie
+
+    def search(self, segments):
+        for segment in segments:
+            if segment in self.names:
+                return self.names[segment]
+        node = self.root
+        for segment in segments:
+            node = node.get(segment)
+            if node is None:
+                return None
+            if self.END in node:
+                return node[self.END]
+        return None
+
+
+class GlobSet:
+    """Glob entries compiled into a single alternation regex."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.path_source = self._translate([p for p in self.patterns if "/" in p.rstrip("/")])
+        self.name_source = self._translate([p for p in self.patterns if "/" not in p.rstrip("/")])
+        self._compile()
+
+    @staticmethod
+    def _translate(patterns):
+        if not patterns:
+            return None
+        parts = []
+        for index, pattern in enumerate(patterns):
+            translated = fnmatch.translate(pattern.strip("/"))
+            parts.append(f"(?P<p{index}>{translated})")
+        return "|".join(parts), patterns
+
+    def _compile(self):
+        self.path_regex, self.name_regex = (
+            (re.compile(source[0]), source[1]) if source else None
+            for source in (self.path_source, self.name_source)
+        )
+
+    def to_state(self):
+        return {"patterns": self.patterns, "path": self.path_source, "name": self.name_source}
+
+    @classmethod
+    def from_state(cls, state):
+        globs = cls.__new__(cls)
+        globs.patterns, globs.path_source, globs.name_source = state["patterns"], state["path"], state["name"]
+        globs._compile()
+        return globs
+
+    @staticmethod
+    def _lookup(compiled, text):
+        regex, entries = compiled
+        match = regex.match(text)
+        if match is None:
+            return None
+        return entries[int(match.lastgroup[1:])]
+
+    def search(self, path, segments):
+        if self.path_regex is not None:
+            # Patterns with a slash match the path or any of its parent dirs
+            prefix = ""
+            for segment in segments:
+                prefix = f"{prefix}/{segment}" if prefix else segment
+                found = self._lookup(self.path_regex, prefix)
+                if found is not None:
+                    return found
+        if self.name_regex is not None:
+            for segment in segments:
+                found = self._lookup(self.name_regex, segment)
+                if found is not None:
+                    return found
+        return None
+
+
+class PatternMatcher:
+    """Matches paths against a merged pattern list in a single pass."""
+
+    def __init__(self, patterns, mode="contains"):
+        if mode not in ("contains", "glob"):
+            raise ValueError(f"Unknown matcher mode: {mode}")
+        self.mode = mode
+        self.patterns = list(dict.fromkeys(patterns))
+        if mode == "contains":
+            self.automaton = SubstringAutomaton(self.patterns)
+        else:
+            literals = [p for p in self.patterns if not GLOB_CHARS & set(p)]
+            globs = [p for p in self.patterns if GLOB_CHARS & set(p)]
+            self.trie = SegmentTrie(literals)
+            self.globs = GlobSet(globs)
+
+    def to_state(self):
+        state = {"mode": self.mode, "patterns": self.patterns}
+        if self.mode == "contains":
+            state["automaton"] = self.automaton.to_state()
+        else:
+            state["trie"] = self.trie.to_state()
+            state["globs"] = self.globs.to_state()
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a matcher from `to_state()` output without recompiling its tables."""
+        matcher = cls.__new__(cls)
+        matcher.mode = state["mode"]
+        matcher.patterns = state["patterns"]
+        if matcher.mode == "contains":
+            matcher.automaton = SubstringAutomaton.from_state(state["automaton"])
+        else:
+            matcher.trie = SegmentTrie.from_state(state["trie"])
+            matcher.globs = GlobSet.from_state(state["globs"])
+        return matcher
+
+    def match(self, path, project_dir=None):
+        """Return the first entry matching `path`, or None."""
+        path = normalize_path(path, project_dir)
+        if self.mode == "contains":
+            return self.automaton.search(path)
+        segments = [s for s in path.split("/") if s and s != "."]
+        found = self.trie.search(segments)
+        if found is None:
+            found = self.globs.search(path, segments)
+        return found
+
+    def __contains__(self, path):
+        return self.match(path) is not None
+
+
+_matchers = {}
+
+
+def _fingerprint(sources):
+    fingerprint = []
+    for source in sources:
+        try:
+            stat = os.stat(source)
+            fingerprint.append([str(source), stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            fingerprint.append([str(source), None, None])
+    return fingerprint
+
+
+def _read_cache(cache_path, fingerprint):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            info = os.fstat(f.fileno())
+            # Another user could plant tables that hide entries: only trust our own file
+            if info.st_uid != os.getuid() or info.st_mode & 0o022:
+                return None
+            data = json.load(f)
+        if data["format"] != MATCHER_FORMAT or data["fingerprint"] != fingerprint:
+            return None
+        return PatternMatcher.from_state(data["matcher"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error):
+        return None
+
+
+def _write_cache(cache_path, fingerprint, matcher):
+    data = {"format": MATCHER_FORMAT, "fingerprint": fingerprint, "matcher": matcher.to_state()}
+    try:
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def load_matcher(project_dir, sources, mode="contains", cache_name=None):
+    """
+    Return a compiled matcher for the given pattern files.
+
+    The matcher is kept in memory and, with `cache_name`, as JSON under
+    .claude/.tmp/matchers/; both are reused until one of the source files
+    changes.
+    """
+    project_dir = Path(os.path.realpath(project_dir))
+    sources = [Path(source) if os.path.isabs(source) else project_dir / source for source in sources]
+    key = (mode, tuple(str(source) for source in sources))
+    fingerprint = [mode] + _fingerprint(sources)
+
+    cached = _matchers.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    cache_path = project_dir / CACHE_DIR / f"{cache_name}.json" if cache_name else None
+    matcher = _read_cache(cache_path, fingerprint) if cache_path else None
+    if matcher is None:
+        patterns = []
+        for source in sources:
+            patterns.extend(read_patterns(source))
+        matcher = PatternMatcher(patterns, mode)
+        if cache_path is not None:
+            _write_cache(cache_path, fingerprint, matcher)
+    _matchers[key] = (fingerprint, matcher)
+    return matcher
+
+
+def ignore_matcher(project_dir):
+    return load_matcher(project_dir, [os.path.join(".claude", ".ignore")], "contains", "ignore")
+
+
+def immutable_matcher(project_dir):
+    return load_matcher(project_dir, [os.path.join(".claude", ".immutable")], "contains", "immutable")
+
+
+def exclusion_matcher(project_dir):
+    return load_matcher(
+        project_dir, [os.path.join(".claude", ".exclude_security_checks")], "glob", "exclude_security_checks"
+    )
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Cached access to .claude/preferences.json.
+
+The parsed preferences are kept in memory and re-read only when the file's
+mtime or size changes, so a long-lived process (the resident hook server and
+the hooks it forks) parses the file once rather than on every call.
+
+Usage:
+    from utils.preferences import load_preferences
+
+    if load_preferences(project_dir).get("trace_spool", {}).get("enabled"):
+        ...
+"""
+
+import json
+import os
+
+PREFERENCES_RELATIVE_PATH = os.path.join(".claude", "preferences.json")
+
+_cache = {}
+
+
+def load_preferences(project_dir):
+    """Return the project's preferences as a dict ({} if missing or invalid)."""
+    path = os.path.join(os.path.realpath(project_dir), PREFERENCES_RELATIVE_PATH)
+    try:
+        info = os.stat(path)
+    except OSError:
+        return {}
+    key = (info.st_mtime_ns, info.st_size)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            preferences = json.load(f)
+    except (OSError, ValueError):
+        preferences = {}
+    if not isinstance(preferences, dict):
+        preferences = {}
+    _cache[path] = (key, preferences)
+    return preferences
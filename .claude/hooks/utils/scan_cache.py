@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Incremental, parallel file scanning for the standalone secret scanner.
+
+Findings are cached per file in .claude/.tmp/security-scan-cache.json, keyed
+by path, size, mtime and content hash. The whole cache is dropped when the
+scanner's pattern set or the .exclude_security_checks file changes. The
+content hash is always a git blob id: tracked files that are clean in git's
+index reuse the index entry, so they are never re-read, and every other file
+(symlinks included, by the content they point to) is hashed the same way, so
+a file keeps its key when it moves in or out of the index. Files that do need
+scanning are spread across a process pool.
+
+Nothing calls this yet; prevent-learning-secrets.py --standalone would use:
+
+    from utils.scan_cache import incremental_scan, scan_version
+
+    version = scan_version(SECRET_PATTERNS, project_dir)
+    findings = incremental_scan(project_dir, files, scan_file, version)
+
+`scan_file` must be a module-level function taking an absolute path and
+returning a JSON-serializable list of findings. Results are returned sorted
+by path, so cold and warm scans produce the same report.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+CACHE_FORMAT = 2
+CACHE_RELATIVE_PATH = os.path.join(".claude", ".tmp", "security-scan-cache.json")
+EXCLUSIONS_RELATIVE_PATH = os.path.join(".claude", ".exclude_security_checks")
+
+# Below this many files to scan, a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+
+# Git's object formats, by the length of their hex object ids
+OBJECT_FORMATS = {40: "sha1", 64: "sha256"}
+
+
+def file_digest(path, algorithm="sha1"):
+    """Return the git blob id of a file's content, as `git hash-object` would."""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        digest.update(b"blob %d\0" % os.fstat(f.fileno()).st_size)
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_version(patterns, project_dir):
+    """Fingerprint of the pattern set and the security check exclusions."""
+    digest = hashlib.sha256()
+    digest.update(f"format:{CACHE_FORMAT}\n".encode())
+    digest.update(json.dumps(patterns, sort_keys=True, default=str).encode())
+    exclusions = Path(project_dir) / EXCLUSIONS_RELATIVE_PATH
+    try:
+        digest.update(exclusions.read_bytes())
+    except OSError:
+        digest.update(b"<no exclusions>")
+    return digest.hexdigest()
+
+
+def git_clean_blobs(project_dir):
+    """Return {relative path: blob id} for tracked files unchanged in the worktree."""
+    def git(*args):
+        return subprocess.run(
+            ["git", "-C", str(project_dir)] + list(args),
+            capture_output=True, check=True,
+        ).stdout
+
+    try:
+        # Refresh the index stat cache first so `ls-files -m` stays cheap
+        subprocess.run(
+            ["git", "-C", str(project_dir), "update-index", "-q", "--refresh"],
+            capture_output=True,
+        )
+        staged = git("ls-files", "-s", "-z")
+        dirty = git("ls-files", "-m", "-d", "-z")
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    changed = {p.decode("utf-8", "surrogateescape") for p in dirty.split(b"\0") if p}
+    blobs = {}
+    for entry in staged.split(b"\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition(b"\t")
+        mode, oid, stage = meta.split(b" ")
+        path = path.decode("utf-8", "surrogateescape")
+        if stage != b"0" or path in changed:
+            continue
+        # A symlink's blob is the link text, not the content the scanner reads,
+        # and a gitlink is a submodule commit: both are keyed on content instead
+        if mode in (b"120000", b"160000"):
+            continue
+        blobs[path] = oid.decode()
+    return blobs
+
+
+class ScanCache:
+    """Persistent per-file findings, valid for one scan version."""
+
+    def __init__(self, project_dir, version):
+        self.path = Path(project_dir) / CACHE_RELATIVE_PATH
+        self.version = version
+        self.entries = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.version:
+            self.entries = data.get("files", {})
+
+    def save(self, entries):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "files": entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+def _run_scans(paths, scan_file, workers):
+    if len(paths) < PARALLEL_THRESHOLD or workers == 1:
+        return [scan_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(scan_file, paths, chunksize=chunksize))
+
+
+def incremental_scan(project_dir, files, scan_file, version, use_cache=True, workers=None):
+    """
+    Scan files, reusing cached findings for files that have not changed.
+
+    Returns a dict of {relative path: findings}, sorted by path.
+    """
+    project_dir = Path(project_dir).resolve()
+    cache = ScanCache(project_dir, version)
+    if use_cache:
+        cache.load()
+    blobs = git_clean_blobs(project_dir) if use_cache else {}
+    # Hash other files with the repository's object format, so their ids match the index
+    algorithm = OBJECT_FORMATS.get(len(next(iter(blobs.values()), "")), "sha1")
+
+    entries = {}
+    results = {}
+    to_scan = []
+    for file_path in files:
+        absolute = Path(file_path)
+        if not absolute.is_absolute():
+            absolute = project_dir / absolute
+        relative = os.path.relpath(absolute, project_dir)
+        try:
+            stat = absolute.stat()
+        except OSError:
+            continue
+
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if absolute.is_symlink():
+            # stat() follows the link, so a retargeted link must not look unchanged
+            entry["target"] = os.path.realpath(absolute)
+        cached = cache.entries.get(relative)
+        if (
+            cached and cached["size"] == entry["size"] and cached["mtime_ns"] == entry["mtime_ns"]
+            and cached.get("target") == entry.get("target")
+        ):
+            entry["hash"] = cached["hash"]
+        else:
+            try:
+                entry["hash"] = blobs.get(relative) or file_digest(absolute, algorithm)
+            except OSError:
+                continue
+
+        if cached and cached["hash"] == entry["hash"]:
+            entry["findings"] = cached["findings"]
+            results[relative] = cached["findings"]
+        else:
+            to_scan.append((relative, str(absolute)))
+        entries[relative] = entry
+
+    scanned = _run_scans([absolute for _, absolute in to_scan], scan_file, workers)
+    for (relative, _), findings in zip(to_scan, scanned):
+        entries[relative]["findings"] = findings
+        results[relative] = findings
+
+    cache.save(entries)
+    return dict(sorted(results.items()))
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Write-behind trace logging.
+
+Hooks append events to .claude/logs/trace-spool.jsonl with a single small
+O_APPEND write instead of opening trace.sqlite, inserting, committing and
+appending to the text logs themselves. A background flusher moves spooled
+events into trace.sqlite in batched transactions, with the database in WAL
+mode so the tracer's reads never block it.
+
+The flusher renames the spool to a uniquely named batch file before draining
+it and records its read offset in the same transaction as the inserted rows,
+so an event is either still in a spool file or committed to the database:
+nothing is lost if either side crashes, and nothing is inserted twice. The
+flusher commits with synchronous=FULL, so a batch is durable before its spool
+file is removed, even across a power loss.
+
+Usage from hooks:
+
+    from utils.trace_spool import append_event, spool_enabled
+
+    if spool_enabled():
+        append_event("events", row, text_log=("bash-logs.txt", line))
+
+`record_event` takes the same arguments and falls back to a direct insert
+when spooling is disabled.
+
+Flusher (started by clauder.sh when enabled):
+
+    python3 .claude/hooks/utils/trace_spool.py watch   # flush continuously
+    python3 .claude/hooks/utils/trace_spool.py flush   # flush once
+"""
+
+import fcntl
+import json
+import os
+import re
+import signal
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+try:
+    from .preferences import load_preferences
+except ImportError:  # run as a script: .claude/hooks/utils is on sys.path
+    from preferences import load_preferences
+
+PROJECT_DIR = Path(__file__).resolve().parents[3]
+LOGS_DIR = PROJECT_DIR / ".claude" / "logs"
+DB_PATH = LOGS_DIR / "trace.sqlite"
+SPOOL_PATH = LOGS_DIR / "trace-spool.jsonl"
+
+BATCH_SIZE = 1000
+WATCH_INTERVAL = 0.5
+# Time to let writers holding the renamed spool open finish their append
+RENAME_GRACE_SECONDS = 1.0
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+STATE_TABLE = "_trace_spool_state"
+
+
+def spool_enabled(project_dir=PROJECT_DIR):
+    """Spooling is opt-in via CLAUDER_TRACE_SPOOL=1 or preferences.json."""
+    value = os.environ.get("CLAUDER_TRACE_SPOOL")
+    if value is not None:
+        return value == "1"
+    try:
+        return bool(load_preferences(project_dir).get("trace_spool", {}).get("enabled", False))
+    except AttributeError:
+        return False
+
+
+def append_event(table, row, text_log=None, spool_path=SPOOL_PATH):
+    """
+    Spool one event for `table`. `text_log` is an optional (file name, line)
+    pair appended to .claude/logs/<file name> by the flusher.
+    """
+    record = {"table": table, "row": row}
+    if text_log is not None:
+        record["text_log"] = list(text_log)
+    data = (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+
+    spool_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(spool_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def record_event(table, row, text_log=None):
+    """
+    Record one event: spooled when write-behind logging is enabled, otherwise
+    inserted into trace.sqlite directly.
+    """
+    if spool_enabled():
+        append_event(table, row, text_log)
+        return
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    connection = connect()
+    try:
+        TableWriter(connection).insert(table, row)
+        if text_log is not None:
+            append_text_logs({text_log[0]: [text_log[1]]}, LOGS_DIR)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def connect(db_path=DB_PATH, synchronous="NORMAL"):
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(f"PRAGMA synchronous={synchronous}")
+    connection.execute(
+        f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (name TEXT PRIMARY KEY, offset INTEGER)"
+    )
+    return connection
+
+
+def _oversized_int(value):
+    # SQLite integers are 64-bit; binding a larger one can never succeed
+    return isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63
+
+
+class TableWriter:
+    """Inserts spooled rows, creating tables and columns on first use."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.columns = {}
+
+    def _ensure(self, table, row):
+        columns = self.columns.get(table)
+        if columns is None:
+            # SQLite column names are case-insensitive
+            columns = {r[1].lower() for r in self.connection.execute(f'PRAGMA table_info("{table}")')}
+            if not columns:
+                self.connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" (id INTEGER PRIMARY KEY AUTOINCREMENT)'
+                )
+                columns = {"id"}
+            self.columns[table] = columns
+        for column in row:
+            if column.lower() not in columns:
+                self.connection.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+                columns.add(column.lower())
+
+    def insert(self, table, row):
+        if not IDENTIFIER.match(table) or not all(IDENTIFIER.match(c) for c in row):
+            return
+        row = {k: (json.dumps(v) if isinstance(v, (dict, list)) or _oversized_int(v) else v) for k, v in row.items()}
+        self._ensure(table, row)
+        names = ", ".join(f'"{c}"' for c in row)
+        placeholders = ", ".join("?" for _ in row)
+        self.connection.execute(f'INSERT INTO "{table}" ({names}) VALUES ({placeholders})', list(row.values()))
+
+
+def read_offset(connection, name):
+    row = connection.execute(f"SELECT offset FROM {STATE_TABLE} WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def append_text_logs(text_logs, logs_dir):
+    for name, lines in text_logs.items():
+        if os.path.basename(name) != name:
+            continue
+        with open(logs_dir / name, "a", encoding="utf-8") as f:
+            f.write("".join(line if line.endswith("\n") else line + "\n" for line in lines))
+
+
+def parse_record(line):
+    """Return (table, row, text_log) for a spooled line, or None if it is malformed."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    table, row, text_log = record.get("table"), record.get("row"), record.get("text_log")
+    if not isinstance(table, str) or not isinstance(row, dict):
+        return None
+    if text_log and not (
+        isinstance(text_log, list) and len(text_log) == 2 and all(isinstance(v, str) for v in text_log)
+    ):
+        text_log = None
+    return table, row, text_log
+
+
+def drain(connection, flushing_path, logs_dir):
+    """Move complete records from the flushing file into the database."""
+    offset = read_offset(connection, flushing_path.name)
+    writer = TableWriter(connection)
+
+    with open(flushing_path, "rb") as f:
+        f.seek(offset)
+        while True:
+            lines = f.readlines(BATCH_SIZE * 512)
+            complete = [line for line in lines if line.endswith(b"\n")]
+            if not complete:
+                break
+
+            text_logs = {}
+            try:
+                for line in complete:
+                    record = parse_record(line)
+                    if record is None:
+                        # Unparseable records can never succeed: skip them
+                        continue
+                    table, row, text_log = record
+                    writer.insert(table, row)
+                    if text_log:
+                        text_logs.setdefault(text_log[0], []).append(text_log[1])
+
+                # Text logs first: a crash before the commit replays (duplicates) them
+                # rather than losing them.
+                append_text_logs(text_logs, logs_dir)
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {STATE_TABLE} (name, offset) VALUES (?, ?)",
+                    (flushing_path.name, offset + sum(len(line) for line in complete)),
+                )
+                connection.commit()
+            except sqlite3.Error:
+                # Keep the stored offset so the whole batch is retried
+                connection.rollback()
+                raise
+            offset += sum(len(line) for line in complete)
+
+            if len(complete) < len(lines):
+                # Torn trailing record still being written; pick it up next round
+                break
+
+    stat = flushing_path.stat()
+    idle = time.time() - stat.st_mtime >= RENAME_GRACE_SECONDS
+    if idle and (offset >= stat.st_size or time.time() - stat.st_mtime >= 60):
+        # Fully drained (or only a torn record from a crashed writer is left)
+        flushing_path.unlink()
+        connection.execute(f"DELETE FROM {STATE_TABLE} WHERE name = ?", (flushing_path.name,))
+        connection.commit()
+        return True
+    return False
+
+
+def flush(spool_path=SPOOL_PATH, db_path=DB_PATH):
+    """Flush all spooled events. Only one flusher runs at a time."""
+    logs_dir = spool_path.parent
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    with open(logs_dir / "trace-spool.lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+        # FULL: a batch's commit must reach the disk before its spool file is unlinked,
+        # and with only one commit per batch the extra fsync is cheap
+        connection = connect(db_path, synchronous="FULL")
+        try:
+            while True:
+                batches = sorted(logs_dir.glob(f"{spool_path.stem}.*.flushing"))
+                if batches:
+                    if not drain(connection, batches[0], logs_dir):
+                        return
+                elif spool_path.exists() and spool_path.stat().st_size > 0:
+                    os.replace(spool_path, logs_dir / f"{spool_path.stem}.{time.time_ns():020d}.flushing")
+                else:
+                    return
+        finally:
+            connection.close()
+
+
+def watch(interval=WATCH_INTERVAL):
+    running = [True]
+
+    def stop(signum, frame):
+        running[0] = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while running[0]:
+        try:
+            flush()
+        except (OSError, sqlite3.Error) as e:
+            print(f"trace-spool: flush failed: {e}", file=sys.stderr)
+        time.sleep(interval)
+    flush()
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "flush"
+    if command == "flush":
+        flush()
+        return 0
+    if command == "watch":
+        watch()
+        return 0
+    print("Usage: trace_spool.py [flush|watch]", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
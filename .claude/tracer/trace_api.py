@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Paginated queries and live streaming for the Clauder tracer.
+
+For app.py to register with `register_trace_api(app, db_path)` (it does not
+call it yet, so none of these routes are served):
+
+    GET /api/events   keyset-paginated, filterable event history
+    GET /api/stream   server-sent events, pushing only rows past the
+                      client's last rowid (Last-Event-ID or ?after=)
+    GET /api/hook-timings
+                      per-hook wall time over time, recorded by hook-client.py
+                      when CLAUDER_HOOK_TIMING=1
+
+Both endpoints read with their own read-only connection, page by rowid and
+never load more than one page in memory, so the server stays flat no matter
+how large trace.sqlite grows. Supporting indexes are created on startup.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+STREAM_POLL_INTERVAL = 0.5
+STREAM_HEARTBEAT_INTERVAL = 15
+
+# Filter name -> candidate column names, in order of preference
+FILTER_COLUMNS = {
+    "event_type": ("event_type", "hook_event_name", "event_name", "event"),
+    "tool": ("tool_name", "tool"),
+    "decision": ("decision",),
+    "session": ("session_id", "session"),
+}
+TIME_COLUMNS = ("timestamp", "created_at", "time", "ts")
+
+HOOK_TIMINGS_TABLE = "hook_timings"
+DEFAULT_TIMING_BUCKET = 3600
+# Tables written by clauder itself, never picked as the trace table
+INTERNAL_TABLES = (HOOK_TIMINGS_TABLE,)
+
+
+class TraceSchema:
+    """Table and column names of the trace database, resolved at startup."""
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.filters = {}
+        for name, candidates in FILTER_COLUMNS.items():
+            column = next((c for c in candidates if c in columns), None)
+            if column:
+                self.filters[name] = column
+        self.time_column = next((c for c in TIME_COLUMNS if c in columns), None)
+
+    @classmethod
+    def detect(cls, connection, table=None):
+        tables = [
+            row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )
+        ]
+        if table is None:
+            candidates = [t for t in tables if t not in INTERNAL_TABLES and not t.startswith("_")]
+            # Pick the table exposing the most traceable columns
+            def score(name):
+                columns = cls._columns(connection, name)
+                known = [c for group in FILTER_COLUMNS.values() for c in group] + list(TIME_COLUMNS)
+                return sum(1 for c in columns if c in known)
+            table = max(candidates, key=score, default=None)
+        if table is None or table not in tables:
+            return None
+        return cls(table, cls._columns(connection, table))
+
+    @staticmethod
+    def _columns(connection, table):
+        return [row[1] for row in connection.execute(f'PRAGMA table_info("{table}")')]
+
+    def ensure_indexes(self, connection):
+        columns = list(self.filters.values())
+        if self.time_column:
+            columns.append(self.time_column)
+        for column in columns:
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{self.table}_{column}" ON "{self.table}" ("{column}")'
+            )
+        connection.commit()
+
+
+def connect_readonly(db_path):
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def build_query(schema, args, after=None, before=None, limit=DEFAULT_PAGE_SIZE, ascending=False):
+    """Build a keyset-paginated SELECT for the given filters."""
+    clauses = []
+    params = []
+    for name, column in schema.filters.items():
+        values = [v for v in args.getlist(name) if v]
+        if not values:
+            continue
+        clauses.append(f'"{column}" IN ({", ".join("?" for _ in values)})')
+        params.extend(values)
+
+    unknown = [name for name in FILTER_COLUMNS if args.get(name) and name not in schema.filters]
+    if unknown:
+        raise ValueError(f"Unsupported filter(s) for this trace database: {', '.join(unknown)}")
+
+    if args.get("since") or args.get("until"):
+        if schema.time_column is None:
+            raise ValueError("This trace database has no timestamp column")
+        if args.get("since"):
+            clauses.append(f'"{schema.time_column}" >= ?')
+            params.append(args["since"])
+        if args.get("until"):
+            clauses.append(f'"{schema.time_column}" <= ?')
+            params.append(args["until"])
+
+    if after is not None:
+        clauses.append("rowid > ?")
+        params.append(after)
+    if before is not None:
+        clauses.append("rowid < ?")
+        params.append(before)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = "ASC" if ascending else "DESC"
+    sql = f'SELECT rowid AS _rowid, * FROM "{schema.table}" {where} ORDER BY rowid {order} LIMIT ?'
+    params.append(limit)
+    return sql, params
+
+
+def row_to_dict(row):
+    event = dict(row)
+    event["rowid"] = event.pop("_rowid")
+    return event
+
+
+def parse_int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def hook_timing_buckets(connection, since=None, until=None, bucket=DEFAULT_TIMING_BUCKET):
+    """
+    Per-hook call count, average and max wall time for each time bucket.
+
+    hook-client.py records timestamps in UTC, which is what strftime('%s')
+    assumes; buckets are Unix times.
+    """
+    clauses = []
+    params = [bucket, bucket]
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp <= ?")
+        params.append(until)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""
+        SELECT hook,
+               CAST(strftime('%s', timestamp) AS INTEGER) / ? * ? AS bucket,
+               COUNT(*) AS calls,
+               AVG(duration_ms) AS avg_ms,
+               MAX(duration_ms) AS max_ms
+        FROM "{HOOK_TIMINGS_TABLE}" {where}
+        GROUP BY hook, bucket
+        ORDER BY bucket, hook
+    """
+    return [dict(row) for row in connection.execute(sql, params)]
+
+
+def register_trace_api(app, db_path, table=None):
+    """Create indexes and register the /api/events, /api/stream and /api/hook-timings routes."""
+    blueprint = Blueprint("trace_api", __name__)
+    state = {"schema": None}
+
+    def get_schema():
+        # sqlite3.connect() would create an empty database: wait for the real one
+        if state["schema"] is None and os.path.isfile(db_path):
+            try:
+                with sqlite3.connect(db_path) as connection:
+                    schema = TraceSchema.detect(connection, table)
+                    if schema is not None:
+                        schema.ensure_indexes(connection)
+                        state["schema"] = schema
+            except sqlite3.Error:
+                return None
+        return state["schema"]
+
+    @blueprint.route("/api/events")
+    def events():
+        schema = get_schema()
+        after = parse_int(request.args.get("after"))
+        if schema is None:
+            return jsonify({"events": [], "next_before": None, "next_after": after})
+
+        limit = min(max(parse_int(request.args.get("limit"), DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+        before = parse_int(request.args.get("before"))
+        try:
+            sql, params = build_query(schema, request.args, after=after, before=before,
+                                      limit=limit, ascending=after is not None)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        connection = connect_readonly(db_path)
+        try:
+            rows = [row_to_dict(row) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+
+        rows.sort(key=lambda event: event["rowid"], reverse=True)
+        if after is not None:
+            # Paging forward: continue from the newest row returned (or keep polling from `after`)
+            next_before = None
+            next_after = rows[0]["rowid"] if rows else after
+        else:
+            next_before = rows[-1]["rowid"] if len(rows) == limit else None
+            next_after = None
+        return jsonify({"events": rows, "next_before": next_before, "next_after": next_after})
+
+    @blueprint.route("/api/stream")
+    def stream():
+        schema = get_schema()
+        last_rowid = parse_int(request.headers.get("Last-Event-ID"))
+        if last_rowid is None:
+            last_rowid = parse_int(request.args.get("after"))
+        args = request.args.copy()
+
+        def generate():
+            nonlocal schema, last_rowid
+            connection = None
+            data_version = None
+            last_sent = time.monotonic()
+            try:
+                while True:
+                    if schema is None:
+                        schema = get_schema()
+                    if schema is not None and connection is None:
+                        connection = connect_readonly(db_path)
+                        if last_rowid is None:
+                            # New clients start from now; history comes from /api/events
+                            last_rowid = connection.execute(
+                                f'SELECT COALESCE(MAX(rowid), 0) FROM "{schema.table}"'
+                            ).fetchone()[0]
+
+                    # PRAGMA data_version only changes when another connection commits,
+                    # so an idle database costs one pragma per poll and no row reads.
+                    if connection is not None:
+                        version = connection.execute("PRAGMA data_version").fetchone()[0]
+                        if version != data_version:
+                            data_version = version
+                            while True:
+                                sql, params = build_query(schema, args, after=last_rowid,
+                                                          limit=STREAM_BATCH_SIZE, ascending=True)
+                                rows = connection.execute(sql, params).fetchall()
+                                for row in rows:
+                                    event = row_to_dict(row)
+                                    last_rowid = event["rowid"]
+                                    yield f"id: {last_rowid}\ndata: {json.dumps(event, default=str)}\n\n"
+                                    last_sent = time.monotonic()
+                                if len(rows) < STREAM_BATCH_SIZE:
+                                    break
+
+                    if time.monotonic() - last_sent >= STREAM_HEARTBEAT_INTERVAL:
+                        yield ": keep-alive\n\n"
+                        last_sent = time.monotonic()
+                    time.sleep(STREAM_POLL_INTERVAL)
+            except (ValueError, sqlite3.Error) as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            finally:
+                if connection is not None:
+                    connection.close()
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
+    @blueprint.route("/api/hook-timings")
+    def hook_timings():
+        bucket = max(parse_int(request.args.get("bucket"), DEFAULT_TIMING_BUCKET), 1)
+        connection = None
+        try:
+            connection = connect_readonly(db_path)
+            buckets = hook_timing_buckets(connection, request.args.get("since"),
+                                          request.args.get("until"), bucket)
+        except sqlite3.OperationalError:
+            # No database yet, or no hook has been timed yet
+            buckets = []
+        finally:
+            if connection is not None:
+                connection.close()
+        return jsonify({"bucket": bucket, "timings": buckets})
+
+    app.register_blueprint(blueprint)
+    get_schema()
+    return blueprint
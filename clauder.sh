@@ -18,6 +18,13 @@ UPDATE_SCRIPT="$CLAUDER_DIR/clauder_update_check.sh"
 SECURITY_SCRIPT="$CLAUDER_DIR/clauder_security_check.sh"
 FOOTER_FILE="$CLAUDER_DIR/assets/clauder_footer.txt"
 
+# Preflight cache settings (TTLs in seconds, 0 disables caching)
+PREFLIGHT_CACHE_DIR=".claude/.tmp/preflight"
+CLAUDER_UPDATE_CHECK_TTL="${CLAUDER_UPDATE_CHECK_TTL:-3600}"
+CLAUDER_MCP_STATUS_TTL="${CLAUDER_MCP_STATUS_TTL:-300}"
+HOOK_SERVER=".claude/hooks/hook-server.py"
+TRACE_SPOOL=".claude/hooks/utils/trace_spool.py"
+
 # Function to display footer
 clauder_footer() {
     if [[ -f "$FOOTER_FILE" ]]; then
@@ -72,6 +79,246 @@ source_shell_configs() {
     echo ""
 }
 
+# Function to check if an opt-in feature is enabled
+# Usage: preference_enabled <ENV_VAR> <json_key>
+# ENV_VAR=1/0 takes precedence over {"<json_key>": {"enabled": true}} in .claude/preferences.json
+preference_enabled() {
+    local env_value="${!1}"
+    local key="$2"
+    
+    if [[ "$env_value" == "1" ]]; then
+        return 0
+    elif [[ "$env_value" == "0" ]]; then
+        return 1
+    fi
+    
+    local preferences_file=".claude/preferences.json"
+    if [[ -f "$preferences_file" ]] && command -v jq >/dev/null 2>&1; then
+        if [[ "$(jq -r --arg key "$key" '.[$key].enabled // false' "$preferences_file" 2>/dev/null)" == "true" ]]; then
+            return 0
+        fi
+    fi
+    return 1
+}
+
+# Function to start session background services (hook server, trace flusher)
+start_background_services() {
+    if [[ -f "$HOOK_SERVER" ]] && preference_enabled CLAUDER_HOOK_SERVER hook_server; then
+        python3 "$HOOK_SERVER" serve >/dev/null 2>&1 &
+        HOOK_SERVER_PID=$!
+        # hook-client.py only contacts the server when its socket is advertised
+        export CLAUDER_HOOK_SOCKET="$(python3 "$HOOK_SERVER" path)"
+    fi
+    
+    if [[ -f "$TRACE_SPOOL" ]] && preference_enabled CLAUDER_TRACE_SPOOL trace_spool; then
+        python3 "$TRACE_SPOOL" watch >/dev/null 2>&1 &
+        TRACE_FLUSHER_PID=$!
+    fi
+    
+}
+
+# Function to stop the background services started by this session
+stop_background_services() {
+    if [[ -n "$HOOK_SERVER_PID" ]]; then
+        kill "$HOOK_SERVER_PID" 2>/dev/null || true
+        HOOK_SERVER_PID=""
+    fi
+    
+    # The flusher drains the remaining spool before exiting
+    if [[ -n "$TRACE_FLUSHER_PID" ]]; then
+        kill "$TRACE_FLUSHER_PID" 2>/dev/null || true
+        wait "$TRACE_FLUSHER_PID" 2>/dev/null || true
+        TRACE_FLUSHER_PID=""
+    fi
+}
+
+# Function to get the current time in milliseconds (only used for profiling)
+now_ms() {
+    if [[ -n "$EPOCHREALTIME" ]]; then
+        local now="${EPOCHREALTIME/[.,]/}"
+        echo $((now / 1000))
+    else
+        python3 -c 'import time; print(int(time.time() * 1000))'
+    fi
+}
+
+# Function to run a preflight stage and record its duration when profiling
+run_stage() {
+    local stage_name="$1"
+    shift
+    
+    if [[ "$PROFILE_STARTUP" != true ]]; then
+        "$@"
+        return $?
+    fi
+    
+    local start=$(now_ms)
+    "$@"
+    local stage_exit_code=$?
+    local end=$(now_ms)
+    printf '%s\t%s\n' "$stage_name" "$((end - start))" >> "$PREFLIGHT_DIR/timings"
+    return $stage_exit_code
+}
+
+# Function to display the per-stage startup timing breakdown
+display_startup_profile() {
+    if [[ "$PROFILE_STARTUP" != true ]] || [[ ! -f "$PREFLIGHT_DIR/timings" ]]; then
+        return 0
+    fi
+    
+    echo ""
+    print_gray "Startup profile:"
+    echo ""
+    while IFS=$'\t' read -r stage_name duration; do
+        print_gray "$(printf '  %-22s %6s ms' "$stage_name" "$duration")"
+        echo ""
+    done < "$PREFLIGHT_DIR/timings"
+    print_gray "$(printf '  %-22s %6s ms' "total" "$(($(now_ms) - STARTUP_START))")"
+    echo ""
+}
+
+# Function to check if a preflight cache file is younger than its TTL
+# Cache files store their creation time (epoch seconds) on the first line
+cache_is_fresh() {
+    local cache_file="$1"
+    local ttl="$2"
+    
+    if [[ "$ttl" -le 0 ]] || [[ ! -f "$cache_file" ]]; then
+        return 1
+    fi
+    
+    local created_at=$(head -n 1 "$cache_file" 2>/dev/null)
+    if [[ ! "$created_at" =~ ^[0-9]+$ ]]; then
+        return 1
+    fi
+    
+    [[ $(( $(date +%s) - created_at )) -lt "$ttl" ]]
+}
+
+# Function to compute a signature of the shell configuration files
+shell_configs_signature() {
+    cat "$HOME/.bashrc" "$HOME/.bash_profile" "$HOME/.profile" "$HOME/.zshrc" 2>/dev/null | cksum
+}
+
+# Function to compute a signature of what an update or activation changes for the security check
+security_inputs_signature() {
+    {
+        git -C "$CLAUDER_DIR" rev-parse HEAD 2>/dev/null
+        cat .claude/.clauderrc .claude/.exclude_security_checks .claude/preferences.json 2>/dev/null
+    } | cksum
+}
+
+# Function to compute a signature of the MCP server configuration
+# Only the mcpServers entries of ~/.claude.json count: Claude rewrites the rest
+# of that file (usage counters, UI state) on every start
+mcp_config_signature() {
+    {
+        cat .mcp.json 2>/dev/null
+        python3 - "$HOME/.claude.json" "$PWD" 2>/dev/null << 'EOF'
+import json
+import sys
+
+try:
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        config = json.load(f)
+    project = config.get("projects", {}).get(sys.argv[2], {})
+    print(json.dumps([config.get("mcpServers"), project.get("mcpServers")], sort_keys=True))
+except (OSError, ValueError, AttributeError):
+    pass
+EOF
+    } | cksum
+}
+
+# Function to check if the cached MCP server status is fresh and matches the current configuration
+mcp_status_is_fresh() {
+    local cache_file="$1"
+    local ttl="$2"
+    local signature="$3"
+    
+    cache_is_fresh "$cache_file" "$ttl" && [[ "$(sed -n 2p "$cache_file" 2>/dev/null)" == "$signature" ]]
+}
+
+# Function to refresh the cached MCP server status (one state<TAB>name line per server)
+# The cache starts with its creation time and the MCP configuration signature
+refresh_mcp_status() {
+    local cache_file="$1"
+    local signature="$2"
+    
+    if ! command -v claude >/dev/null 2>&1; then
+        return 0
+    fi
+    
+    local mcp_output
+    mcp_output=$(claude mcp list 2>/dev/null) || return 0
+    
+    local temp_file=$(mktemp)
+    {
+        date +%s
+        echo "$signature"
+        # Parse all server lines in a single pass
+        echo "$mcp_output" | awk '
+            tolower($0) ~ /no mcp servers configured/ { exit }
+            /^[a-zA-Z0-9_-][a-zA-Z0-9_-]*:/ {
+                name = $0
+                sub(/:.*$/, "", name)
+                status = $0
+                sub(/^[^:]*: */, "", status)
+                state = (tolower(status) ~ /connected/) ? "connected" : "failed"
+                print state "\t" name
+            }
+        '
+    } > "$temp_file"
+    mv "$temp_file" "$cache_file"
+}
+
+# Function to display active MCP servers from the cached status
+display_mcp_servers() {
+    local cache_file="$1"
+    
+    echo ""
+    print_gray "Active MCP servers:"
+    echo ""
+    
+    local server_count=0
+    if [[ -f "$cache_file" ]]; then
+        local use_colors=false
+        if colors_supported; then
+            use_colors=true
+        fi
+        
+        while IFS=$'\t' read -r server_state server_name; do
+            server_count=$((server_count + 1))
+            if [[ "$server_state" == "connected" ]]; then
+                if [[ "$use_colors" == true ]]; then
+                    echo -e "$(tput setaf 2)✓$(tput sgr0) $(tput setaf 8)$server_name$(tput sgr0)"
+                else
+                    echo "✓ $server_name"
+                fi
+            else
+                if [[ "$use_colors" == true ]]; then
+                    echo -e "$(tput setaf 1)✗$(tput sgr0) $(tput setaf 8)$server_name$(tput sgr0)"
+                else
+                    echo "✗ $server_name"
+                fi
+            fi
+        done < <(tail -n +3 "$cache_file")
+    fi
+    
+    if [[ $server_count -eq 0 ]]; then
+        print_gray "⌀ (none)"
+    fi
+    echo ""
+    echo ""
+}
+
+# Function to remove per-session state and stop background services on exit
+cleanup_session() {
+    stop_background_services
+    if [[ -n "$PREFLIGHT_DIR" ]]; then
+        rm -rf "$PREFLIGHT_DIR"
+    fi
+}
+
 # Check if required files exist
 if [[ ! -f "$BANNER_SCRIPT" ]]; then
     echo "Error: Banner script not found at $BANNER_SCRIPT"
@@ -88,90 +335,118 @@ if [[ ! -f "$SECURITY_SCRIPT" ]]; then
     exit 1
 fi
 
+# Separate clauder options from the arguments forwarded to Claude
+PROFILE_STARTUP=false
+claude_args=()
+for arg in "$@"; do
+    if [[ "$arg" == "--profile-startup" ]]; then
+        PROFILE_STARTUP=true
+    else
+        claude_args+=("$arg")
+    fi
+done
+
+PREFLIGHT_DIR="$(mktemp -d)"
+trap cleanup_session EXIT
+if [[ "$PROFILE_STARTUP" == true ]]; then
+    STARTUP_START=$(now_ms)
+fi
+
+# Cache preflight results in the project's .claude directory when available
+cache_dir="$PREFLIGHT_DIR"
+if [[ -d ".claude" ]] && mkdir -p "$PREFLIGHT_CACHE_DIR" 2>/dev/null; then
+    cache_dir="$PREFLIGHT_CACHE_DIR"
+fi
+mcp_status_file="$cache_dir/mcp-status"
+export CLAUDER_UPDATE_CHECK_TTL
+
 # Run the banner script
 if [[ -f "$BANNER_FILE" ]]; then
-    bash "$BANNER_SCRIPT" "$BANNER_FILE"
+    run_stage "banner" bash "$BANNER_SCRIPT" "$BANNER_FILE"
 fi
 
-# Source shell configuration files before update check
-source_shell_configs
+# Source shell configuration files before running any checks
+shell_signature=$(shell_configs_signature)
+run_stage "shell configs" source_shell_configs
+
+# Start the independent checks concurrently:
+# - security check (output captured, shown once the update check is done, and
+#   re-run if the update check updated or activated clauder)
+# - update fetch (the slow part of the update check, skipped within its TTL)
+# - MCP server status (skipped within its TTL unless the MCP configuration changed)
+# Job control gives each check its own process group, so the security check
+# terminating its process group on failure does not take this script with it.
+security_signature=$(security_inputs_signature)
+set -m
+run_stage "security check" bash "$SECURITY_SCRIPT" < /dev/null > "$PREFLIGHT_DIR/security-output" 2>&1 &
+security_pid=$!
+CLAUDER_UPDATE_FETCH_STATUS="$PREFLIGHT_DIR/update-fetch-status" \
+    run_stage "update fetch" bash "$UPDATE_SCRIPT" --prefetch < /dev/null > /dev/null 2>&1 &
+prefetch_pid=$!
+mcp_signature=$(mcp_config_signature)
+mcp_pid=""
+if ! mcp_status_is_fresh "$mcp_status_file" "$CLAUDER_MCP_STATUS_TTL" "$mcp_signature"; then
+    run_stage "mcp status" refresh_mcp_status "$mcp_status_file" "$mcp_signature" < /dev/null > /dev/null 2>&1 &
+    mcp_pid=$!
+fi
+set +m
 
-# Run the update check script
-bash "$UPDATE_SCRIPT"
+# Run the interactive update check once the fetch has completed
+wait $prefetch_pid
+CLAUDER_UPDATE_FETCH_STATUS="$PREFLIGHT_DIR/update-fetch-status" run_stage "update check" bash "$UPDATE_SCRIPT"
 
-# Source shell configuration files after update check
-source_shell_configs
+# Source shell configuration files again only if the update changed them
+if [[ "$(shell_configs_signature)" != "$shell_signature" ]]; then
+    run_stage "shell configs (reload)" source_shell_configs
+fi
 
-# Run the security check script and capture exit code
-bash "$SECURITY_SCRIPT"
+# Wait for the security check and abort before starting Claude if it failed
+if [[ "$(security_inputs_signature)" != "$security_signature" ]]; then
+    # The early result checked the previous version: discard it and check again
+    kill -TERM -- -"$security_pid" 2>/dev/null
+    wait $security_pid 2>/dev/null
+    set -m
+    run_stage "security check (rerun)" bash "$SECURITY_SCRIPT" < /dev/null > "$PREFLIGHT_DIR/security-output" 2>&1 &
+    security_pid=$!
+    set +m
+fi
+wait $security_pid
 security_exit_code=$?
+cat "$PREFLIGHT_DIR/security-output"
 
-# Check if security check failed with codes 1 or 2
-if [[ $security_exit_code -eq 1 || $security_exit_code -eq 2 ]]; then
+# Exit codes 1 and 2 report a failed check, 143 means the check terminated itself
+if [[ $security_exit_code -eq 1 || $security_exit_code -eq 2 || $security_exit_code -eq 143 ]]; then
     echo "Security check failed. Aborting execution."
+    if [[ $security_exit_code -eq 143 ]]; then
+        security_exit_code=1
+    fi
     exit $security_exit_code
 fi
 
 # Display footer
 clauder_footer
 
-# Display active MCP servers
-display_mcp_servers() {
-    echo ""
-    print_gray "Active MCP servers:"
-    echo ""
-    if command -v claude >/dev/null 2>&1; then
-        local mcp_output=$(claude mcp list 2>/dev/null)
-        if [ $? -eq 0 ] && [ -n "$mcp_output" ]; then
-            # Check if the output indicates no servers configured
-            if echo "$mcp_output" | grep -qi "no mcp servers configured"; then
-                print_gray "⌀ (none)"
-            else
-                # Filter out header lines and count servers
-                local server_lines=$(echo "$mcp_output" | grep -E '^[a-zA-Z0-9_-][a-zA-Z0-9_-]*:')
-                local server_count=$(echo "$server_lines" | wc -l)
-                
-                if [ "$server_count" -eq 0 ]; then
-                    print_gray "⌀ (none)"
-                else
-                    # Process each server line
-                    echo "$server_lines" | while IFS= read -r line; do
-                        local server_name=$(echo "$line" | sed 's/:.*$//')
-                        local server_status=$(echo "$line" | sed 's/^[^:]*: *//')
-                        
-                        # Check if the status contains "Connected" (case insensitive)
-                        if echo "$server_status" | grep -qi "connected"; then
-                            if colors_supported; then
-                                echo -e "$(tput setaf 2)✓$(tput sgr0) $(tput setaf 8)$server_name$(tput sgr0)"
-                            else
-                                echo "✓ $server_name"
-                            fi
-                        else
-                            if colors_supported; then
-                                echo -e "$(tput setaf 1)✗$(tput sgr0) $(tput setaf 8)$server_name$(tput sgr0)"
-                            else
-                                echo "✗ $server_name"
-                            fi
-                        fi
-                    done
-                fi
-            fi
-            echo ""
-            echo ""
-        else
-            print_gray "⌀ (none)"
-            echo ""
-            echo ""
-        fi
-    else
-        print_gray "⌀ (none)"
-        echo ""
+# Display active MCP servers, refreshed if the update check changed their configuration
+if [[ -n "$mcp_pid" ]]; then
+    wait $mcp_pid
+fi
+if [[ "$(mcp_config_signature)" != "$mcp_signature" ]]; then
+    mcp_signature=$(mcp_config_signature)
+    run_stage "mcp status (rerun)" refresh_mcp_status "$mcp_status_file" "$mcp_signature" < /dev/null > /dev/null 2>&1
+fi
+display_mcp_servers "$mcp_status_file"
+
+display_startup_profile
+
+# Record the wall time of each hook in the trace database if enabled
+# Hooks are timed by hook-client.py, which clauder_activate routes them through while timing is enabled
+if preference_enabled CLAUDER_HOOK_TIMING hook_timing; then
+    export CLAUDER_HOOK_TIMING=1
+    if [[ -f ".claude/settings.json" ]] && ! grep -q "hook-client.py" ".claude/settings.json"; then
+        print_gray "Hook timing is enabled, but no hook is routed through hook-client.py yet: re-run clauder_activate to time them."
         echo ""
     fi
-    
-}
-
-display_mcp_servers
+fi
 
 echo ""
 echo ""
@@ -180,5 +455,12 @@ echo -n "Press any key to start... "
 read -n 1 -s
 echo ""
 
+# Start the resident hook server and trace flusher if enabled
+start_background_services
+
 # Finally, run Claude with all forwarded arguments
-claude "$@" 
\ No newline at end of file
+claude "${claude_args[@]}"
+claude_exit_code=$?
+
+cleanup_session
+exit $claude_exit_code
@@ -120,33 +120,21 @@ check_clauder_directory_activation() {
 }
 
 # Function to create backup of existing .claude directory
+# Backups are deduplicated snapshots in .claude-backup/ (see clauder_backup.sh): only files
+# changed since the previous backup are stored, and old snapshots are pruned automatically.
 create_backup() {
     local target_claude="$1"
     local target_project="$2"
+    local clauder_dir="${CLAUDER_DIR:-$(dirname "$(realpath "$0")")}"
     
     if [ ! -d "$target_claude" ]; then
         return 0  # No existing .claude directory to backup
     fi
     
-    # Create .claude-backup directory if it doesn't exist
-    local backup_dir="$target_project/.claude-backup"
-    if [ ! -d "$backup_dir" ]; then
-        mkdir -p "$backup_dir"
-    fi
-    
-    # Generate timestamp in lowercase-dashed format (including seconds)
-    local timestamp=$(date +%Y-%m-%d-%H-%M-%S | tr '[:upper:]' '[:lower:]')
-    local backup_name="$backup_dir/$timestamp"
-    
     echo "Creating backup of existing .claude directory..."
-    echo "Backup location: $backup_name"
     
-    # Copy existing .claude directory to backup
-    if cp -r "$target_claude" "$backup_name" 2>/dev/null; then
+    if bash "$clauder_dir/clauder_backup.sh" --project "$target_project" create claude; then
         echo "✓ Backup created successfully"
-        
-        # Clean up old backups (keep only 10 most recent)
-        cleanup_old_backups "$backup_dir"
     else
         echo "✗ Failed to create backup"
         return 1
@@ -155,46 +143,6 @@ create_backup() {
     return 0
 }
 
-# Function to clean up old backups (keep only 10 most recent)
-cleanup_old_backups() {
-    local backup_dir="$1"
-    
-    # Get list of backup directories sorted by modification time (newest first)
-    # Use macOS compatible find command
-    local backups=($(find "$backup_dir" -maxdepth 1 -type d -name "20*" -exec stat -f "%m %N" {} \; | sort -nr | cut -d' ' -f2-))
-    
-    # Remove backups beyond the 10th one
-    if [ ${#backups[@]} -gt 10 ]; then
-        local backups_to_remove=()
-        i=10
-        while [ $i -lt ${#backups[@]} ]; do
-            backups_to_remove+=("$(basename "${backups[$i]}")")
-            i=$((i + 1))
-        done
-        
-        echo "Found ${#backups_to_remove[@]} old backup(s) to remove (keeping 10 most recent):"
-        printf '  %s\n' "${backups_to_remove[@]}"
-        echo ""
-        print_white "Do you want to remove these old backups? (y/N): "
-        read -r reply
-        echo
-        
-        if [[ $reply =~ ^[Yy]$ ]]; then
-            echo "Removing old backups..."
-            i=10
-            while [ $i -lt ${#backups[@]} ]; do
-                local old_backup="${backups[$i]}"
-                echo "Removing: $(basename "$old_backup")"
-                rm -rf "$old_backup"
-                i=$((i + 1))
-            done
-            echo "✓ Old backups removed successfully"
-        else
-            echo "Skipping cleanup of old backups"
-        fi
-    fi
-}
-
 # Function to check for existing .claude files that would be overwritten
 check_existing_files() {
     local source_claude="$1"
@@ -237,33 +185,42 @@ check_existing_files() {
     return 0
 }
 
-# Function to merge JSON files deeply
-merge_json_files() {
-    local target_file="$1"
-    local source_file="$2"
-    
-    # Check if both files exist
-    if [ ! -f "$target_file" ] || [ ! -f "$source_file" ]; then
-        echo "Debug: Missing files - target: $target_file, source: $source_file" >&2
-        return 1
-    fi
-    
-    # Use jq to merge JSON files if available
-    if command -v jq >/dev/null 2>&1; then
-        # Create a temporary file for the merged result
-        local temp_file=$(mktemp)
-        
-        # Check if source file is essentially empty (template)
-        local source_content=$(jq -c '.' "$source_file" 2>/dev/null)
-        if [ "$source_content" = "{}" ] || [ "$source_content" = "[]" ]; then
-            rm -f "$temp_file"
-            return 0
-        fi
-        
-        # Use Python for deep merge
-        if python3 -c "
+# Function to apply the base .claude directory and expansion packs in a single pass
+# Usage: apply_claude_configuration <target_claude> <source_claude|""> <expansion_packs_dir> [expansion...]
+#
+# Loads the base configuration and every pack (previously applied ones first, then new ones)
+# in one process, merges settings.json, preferences.json and pattern files in memory, and only
+# writes files whose content changed. A manifest of inputs and outputs makes re-activating
+# with unchanged packs a no-op.
+#
+# Merge semantics:
+# - JSON files: deep merge, dicts merged recursively, lists concatenated, empty overrides ignored
+# - Pattern files (.ignore, .immutable, .exclude_security_checks): existing lines kept, new
+#   non-empty lines appended once
+# - Base settings.json always replaces the target one (custom settings go in settings.local.json)
+#
+# While hook timing is enabled (CLAUDER_HOOK_TIMING=1 or "hook_timing" in preferences.json),
+# Python hook commands in settings.json are routed through hooks/hook-client.py, which records
+# their wall time whether or not the resident hook server runs.
+apply_claude_configuration() {
+    python3 - "$@" <<'PYTHON_EOF'
+import hashlib
 import json
+import os
+import re
+import shutil
 import sys
+import tempfile
+
+MANIFEST_NAME = ".apply_manifest.json"
+MANIFEST_FORMAT = 1
+BASE_MERGEABLE = (".exclude_security_checks", ".ignore", ".immutable", "preferences.json")
+PACK_MERGEABLE = BASE_MERGEABLE + ("settings.json",)
+HOOK_CLIENT = "hook-client.py"
+HOOK_COMMAND = re.compile(
+    r"""^python3?\s+(?P<quote>["']?)(?P<dir>\S*?\.claude/hooks/)(?P<name>[^\s"'/]+\.py)(?P=quote)(?P<rest>\s.*)?$"""
+)
+
 
 def deep_merge(base, override):
     if isinstance(base, dict) and isinstance(override, dict):
@@ -284,186 +241,253 @@ def deep_merge(base, override):
         else:
             return override
 
-try:
-    with open('$target_file', 'r') as f:
-        base = json.load(f)
-    with open('$source_file', 'r') as f:
-        override = json.load(f)
-    
-    merged = deep_merge(base, override)
-    
-    with open('$temp_file', 'w') as f:
-        json.dump(merged, f, indent=2)
-    
-    sys.exit(0)
-except Exception as e:
-    print(f'Debug: Python merge failed: {e}', file=sys.stderr)
-    sys.exit(1)
-" 2>/dev/null; then
-            # Replace the target file with the merged content
-            mv "$temp_file" "$target_file"
-            return 0
-        else
-            # If Python merge fails, fall back to simple concatenation
-            rm -f "$temp_file"
-            echo "Warning: Python merge failed, using fallback method" >&2
-            return 1
-        fi
-    else
-        # Fallback: simple concatenation for JSON files
-        # This is not ideal but works for simple cases
-        echo "Debug: jq not available" >&2
-        return 1
-    fi
-}
 
-# Function to merge text files by preserving custom configurations
-merge_text_files() {
-    local target_file="$1"
-    local source_file="$2"
-    
-    # Check if both files exist
-    if [ ! -f "$target_file" ] || [ ! -f "$source_file" ]; then
-        return 1
-    fi
-    
-    # Create a temporary file for the merged result
-    local temp_file=$(mktemp)
-    
-    # Start with target file content (preserve existing custom configurations)
-    cat "$target_file" > "$temp_file"
-    
-    # Add a newline if the target file doesn't end with one
-    if [ -s "$target_file" ] && [ "$(tail -c1 "$target_file" | wc -l)" -eq 0 ]; then
-        echo "" >> "$temp_file"
-    fi
-    
-    # Read source file line by line and add only non-duplicate lines
-    while IFS= read -r line; do
-        # Skip empty lines
-        if [ -n "$line" ]; then
-            # Check if line already exists in target file (case-sensitive)
-            if ! grep -q "^$(echo "$line" | sed 's/[[\.*^$()+?{|]/\\&/g')$" "$target_file"; then
-                echo "$line" >> "$temp_file"
-            fi
-        fi
-    done < "$source_file"
-    
-    # Replace target file with merged content
-    mv "$temp_file" "$target_file"
-    return 0
-}
+def merge_json(target_bytes, source_bytes):
+    override = json.loads(source_bytes.decode("utf-8"))
+    if override == {} or override == []:
+        return target_bytes
+    base = json.loads(target_bytes.decode("utf-8")) if target_bytes.strip() else {}
+    return json.dumps(deep_merge(base, override), indent=2).encode("utf-8")
 
-# Function to copy expansion pack
-copy_expansion_pack() {
-    local expansion_name="$1"
-    local target_project="$2"
-    local target_claude="$target_project/.claude"
-    local clauder_dir="${CLAUDER_DIR:-$(dirname "$(realpath "$0")")}"
-    local expansion_dir="$clauder_dir/.claude-expansion-packs/$expansion_name"
-    
-    # Check if expansion pack exists
-    if [ ! -d "$expansion_dir" ]; then
-        echo "Warning: Expansion pack '$expansion_name' does not exist."
-        return 1
-    fi
-    
-    echo "Applying expansion pack: $expansion_name"
-    
-    # Files that need special merging
-    local mergeable_files=(".exclude_security_checks" ".ignore" ".immutable" "preferences.json" "settings.json")
-    
-    # Copy all files from expansion pack
-    while IFS= read -r -d '' source_file; do
-        # Get relative path from source
-        local relative_path="${source_file#$expansion_dir/}"
-        local target_file="$target_claude/$relative_path"
-        
-        # Create target directory if it doesn't exist
-        local target_dir=$(dirname "$target_file")
-        if [ ! -d "$target_dir" ]; then
-            mkdir -p "$target_dir"
-        fi
-        
-        # Check if this is a mergeable file
-        local filename=$(basename "$relative_path")
-        local should_merge=false
-        
-        for mergeable_file in "${mergeable_files[@]}"; do
-            if [ "$filename" = "$mergeable_file" ]; then
-                should_merge=true
-                break
-            fi
-        done
-        
-        # Handle file copying/merging
-        if [ "$should_merge" = true ]; then
-            # For mergeable files, create target if it doesn't exist, then merge
-            if [ ! -f "$target_file" ]; then
-                # Create empty target file for merging
-                touch "$target_file"
-            fi
-            
-            # Merge the file
-            if [[ "$filename" == *.json ]]; then
-                if merge_json_files "$target_file" "$source_file"; then
-                    echo "  ✓ Merged: $relative_path"
-                else
-                    echo "  ⚠ Merged (fallback): $relative_path"
-                fi
-            else
-                if merge_text_files "$target_file" "$source_file"; then
-                    echo "  ✓ Merged: $relative_path"
-                else
-                    echo "  ⚠ Merged (fallback): $relative_path"
-                fi
-            fi
-        else
-            # Copy the file normally
-            if cp -f "$source_file" "$target_file" 2>/dev/null; then
-                echo "  ✓ Copied: $relative_path"
-            else
-                echo "  ✗ Failed to copy: $relative_path"
-            fi
-        fi
-    done < <(find "$expansion_dir" -type f -print0 2>/dev/null)
-    
-    # Add expansion name to .claude.expansion_packs if not already present
-    local expansion_packs_file="$target_claude/.expansion_packs"
-    if [ ! -f "$expansion_packs_file" ]; then
-        touch "$expansion_packs_file"
-    fi
-    
-    # Check if expansion name is already in the file
-    if ! grep -q "^$expansion_name$" "$expansion_packs_file" 2>/dev/null; then
-        echo "$expansion_name" >> "$expansion_packs_file"
-        echo "  ✓ Added to expansion packs list"
-    else
-        echo "  ℹ Already in expansion packs list"
-    fi
-    
-    echo "✓ Expansion pack '$expansion_name' applied successfully"
-}
 
-# Function to apply expansion packs
-apply_expansion_packs() {
-    local target_project="$1"
-    shift
-    local expansions=("$@")
-    
-    if [ ${#expansions[@]} -eq 0 ]; then
+def merge_text(target_bytes, source_bytes):
+    target = target_bytes.decode("utf-8")
+    existing = set(target.splitlines())
+    merged = [target]
+    if target and not target.endswith("\n"):
+        merged.append("\n")
+    for line in source_bytes.decode("utf-8").splitlines():
+        if line and line not in existing:
+            existing.add(line)
+            merged.append(line + "\n")
+    return "".join(merged).encode("utf-8")
+
+
+def hook_timing_enabled(preferences_bytes):
+    env_value = os.environ.get("CLAUDER_HOOK_TIMING")
+    if env_value in ("0", "1"):
+        return env_value == "1"
+    try:
+        preferences = json.loads(preferences_bytes.decode("utf-8")) if preferences_bytes else {}
+        return preferences.get("hook_timing", {}).get("enabled", False) is True
+    except (ValueError, UnicodeDecodeError, AttributeError):
+        return False
+
+
+def route_hooks_through_client(settings_bytes):
+    """Prefix every `python3 .claude/hooks/<hook>.py` command with the client stub."""
+    settings = json.loads(settings_bytes.decode("utf-8"))
+    routed = 0
+    hooks = settings.get("hooks") if isinstance(settings, dict) else None
+    for entries in (hooks.values() if isinstance(hooks, dict) else []):
+        for entry in entries if isinstance(entries, list) else []:
+            for hook in entry.get("hooks", []) if isinstance(entry, dict) else []:
+                command = hook.get("command") if isinstance(hook, dict) else None
+                match = HOOK_COMMAND.match(command) if isinstance(command, str) else None
+                if match is None or match["name"] == HOOK_CLIENT:
+                    continue
+                quote, directory = match["quote"], match["dir"]
+                hook["command"] = (
+                    f"python3 -S {quote}{directory}{HOOK_CLIENT}{quote} "
+                    f"{quote}{directory}{match['name']}{quote}{match['rest'] or ''}"
+                )
+                routed += 1
+    if not routed:
+        return settings_bytes
+    return json.dumps(settings, indent=2).encode("utf-8")
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def list_files(root):
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            files.append(os.path.relpath(path, root))
+    return sorted(files)
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def main(target_claude, source_claude, packs_dir, new_packs):
+    manifest_path = os.path.join(target_claude, MANIFEST_NAME)
+    packs_file = os.path.join(target_claude, ".expansion_packs")
+
+    # Previously applied packs first, then new ones (each pack applied once)
+    packs = []
+    if os.path.isfile(packs_file):
+        with open(packs_file, "r", encoding="utf-8") as f:
+            for line in f.read().splitlines():
+                if line.strip() and not line.strip().startswith("#"):
+                    packs.append(line)
+    recorded = list(packs)
+    for pack in new_packs:
+        if pack not in packs:
+            packs.append(pack)
+
+    sources = []
+    if source_claude:
+        sources.append(("base", source_claude))
+    for pack in packs:
+        pack_dir = os.path.join(packs_dir, pack)
+        if os.path.isdir(pack_dir):
+            sources.append((pack, pack_dir))
+        else:
+            print(f"Warning: Expansion pack '{pack}' does not exist.")
+
+    # Fingerprint of every input file, used to short-circuit unchanged re-activations
+    inputs = hashlib.sha256(f"format:{MANIFEST_FORMAT}\n".encode())
+    inputs.update(f"hook_timing:{os.environ.get('CLAUDER_HOOK_TIMING', '')}\n".encode())
+    source_files = {}
+    for name, root in sources:
+        files = list_files(root)
+        source_files[name] = files
+        inputs.update(f"source:{name}\n".encode())
+        for relative in files:
+            inputs.update(f"{relative}:{sha256(read_file(os.path.join(root, relative)))}\n".encode())
+    inputs = inputs.hexdigest()
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    def current_hash(relative):
+        try:
+            return sha256(read_file(os.path.join(target_claude, relative)))
+        except OSError:
+            return None
+
+    if manifest.get("inputs") == inputs and all(
+        current_hash(relative) == digest for relative, digest in manifest.get("outputs", {}).items()
+    ):
+        print("✓ Configuration unchanged, nothing to apply")
         return 0
-    fi
-    
-    echo ""
-    echo "Applying expansion packs..."
-    
-    for expansion in "${expansions[@]}"; do
-        copy_expansion_pack "$expansion" "$target_project"
-    done
-    
-    echo ""
-    echo "All expansion packs applied."
+
+    # Compute the final content of every file in memory
+    contents = {}
+    modes = {}
+    reports = []
+
+    def current(relative):
+        if relative in contents:
+            return contents[relative]
+        try:
+            return read_file(os.path.join(target_claude, relative))
+        except OSError:
+            return None
+
+    for name, root in sources:
+        is_base = name == "base"
+        mergeable = BASE_MERGEABLE if is_base else PACK_MERGEABLE
+        pack_reports = []
+        for relative in source_files[name]:
+            source_path = os.path.join(root, relative)
+            source_bytes = read_file(source_path)
+            existing = current(relative)
+            filename = os.path.basename(relative)
+
+            if filename in mergeable and (existing is not None or not is_base):
+                try:
+                    if filename.endswith(".json"):
+                        contents[relative] = merge_json(existing or b"", source_bytes)
+                    else:
+                        contents[relative] = merge_text(existing or b"", source_bytes)
+                    pack_reports.append(("merged", relative))
+                except (ValueError, UnicodeDecodeError) as e:
+                    if existing is not None:
+                        contents[relative] = existing
+                    pack_reports.append(("failed", f"{relative} (merge failed: {e})"))
+            else:
+                contents[relative] = source_bytes
+                pack_reports.append(("copied", relative))
+            modes.setdefault(relative, source_path)
+        reports.append((name, pack_reports))
+
+    # Time hooks through the client stub while hook timing is enabled
+    settings = current("settings.json")
+    if settings is not None and hook_timing_enabled(current("preferences.json")):
+        try:
+            routed = route_hooks_through_client(settings)
+            if routed != settings:
+                contents["settings.json"] = routed
+                reports.append(("hook timing", [("merged", "settings.json")]))
+        except (ValueError, UnicodeDecodeError) as e:
+            reports.append(("hook timing", [("failed", f"settings.json (hook routing failed: {e})")]))
+
+    # Record newly applied packs
+    applied = [name for name, _ in sources if name != "base"]
+    added = [pack for pack in applied if pack not in recorded]
+    if added or not os.path.isfile(packs_file):
+        existing = current(".expansion_packs") or b""
+        if existing and not existing.endswith(b"\n"):
+            existing += b"\n"
+        contents[".expansion_packs"] = existing + "".join(f"{pack}\n" for pack in added).encode("utf-8")
+
+    # Write only files whose content changed
+    changed = set()
+    failed = set()
+    for relative, data in contents.items():
+        target_path = os.path.join(target_claude, relative)
+        if current_hash(relative) == sha256(data):
+            continue
+        try:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), prefix=".tmp-apply-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            if os.path.exists(target_path):
+                shutil.copymode(target_path, tmp_path)
+            elif relative in modes:
+                shutil.copymode(modes[relative], tmp_path)
+            os.replace(tmp_path, target_path)
+            changed.add(relative)
+        except OSError as e:
+            print(f"Failed to write: {target_path} ({e})", file=sys.stderr)
+            failed.add(relative)
+
+    # Report
+    for name, pack_reports in reports:
+        if name == "base":
+            print("Applied base configuration:")
+        elif name == "hook timing":
+            print("Routing hooks through hook-client.py for hook timing:")
+        else:
+            print(f"Applying expansion pack: {name}")
+        for status, relative in pack_reports:
+            path = relative.split(" (")[0]
+            if status == "failed" or path in failed:
+                print(f"  ✗ {relative}")
+            elif path not in changed:
+                print(f"  = {relative} (unchanged)")
+            elif status == "merged":
+                print(f"  ✓ Merged: {relative}")
+            else:
+                print(f"  ✓ Copied: {relative}")
+        if name not in ("base", "hook timing"):
+            if name in added:
+                print("  ✓ Added to expansion packs list")
+            print(f"✓ Expansion pack '{name}' applied successfully")
+
+    outputs = {relative: sha256(data) for relative, data in contents.items() if relative not in failed}
+    try:
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"inputs": inputs, "packs": applied, "outputs": outputs}, f, indent=2)
+    except OSError:
+        pass
+
+    return 1 if failed else 0
+
+
+sys.exit(main(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4:]))
+PYTHON_EOF
 }
 
 # Function to create .clauderrc file with commit ID
@@ -494,36 +518,6 @@ create_clauderrc() {
     fi
 }
 
-# Function to apply previously applied expansion packs
-apply_previous_expansions() {
-    local target_project="$1"
-    local target_claude="$target_project/.claude"
-    local expansion_packs_file="$target_claude/.expansion_packs"
-    
-    if [ ! -f "$expansion_packs_file" ]; then
-        return 0
-    fi
-    
-    # Read expansion packs from file
-    local previous_expansions=()
-    while IFS= read -r line; do
-        # Skip empty lines and comments
-        if [[ -n "$line" && ! "$line" =~ ^[[:space:]]*# ]]; then
-            previous_expansions+=("$line")
-        fi
-    done < "$expansion_packs_file"
-    
-    if [ ${#previous_expansions[@]} -gt 0 ]; then
-        echo ""
-        echo "Applying previously installed expansion packs..."
-        for expansion in "${previous_expansions[@]}"; do
-            copy_expansion_pack "$expansion" "$target_project"
-        done
-        echo ""
-        echo "All previous expansion packs applied."
-    fi
-}
-
     # Function to select MCP servers interactively
     select_mcp_servers() {
         local servers=("$@")
@@ -1176,46 +1170,6 @@ apply_previous_expansions() {
     fi
 }
 
-# Function to clean up old MCP backup files (keep only 5 most recent)
-cleanup_old_mcp_backups() {
-    local backup_dir="$1"
-    
-    # Get list of backup files sorted by modification time (newest first)
-    # Use macOS compatible find command
-    local backups=($(find "$backup_dir" -maxdepth 1 -type f -name ".mcp.json.backup.*" -exec stat -f "%m %N" {} \; | sort -nr | cut -d' ' -f2-))
-    
-    # Remove backups beyond the 5th one
-    if [ ${#backups[@]} -gt 5 ]; then
-        local backups_to_remove=()
-        i=5
-        while [ $i -lt ${#backups[@]} ]; do
-            backups_to_remove+=("$(basename "${backups[$i]}")")
-            i=$((i + 1))
-        done
-        
-        echo "Found ${#backups_to_remove[@]} old MCP backup(s) to remove (keeping 5 most recent):"
-        printf '  %s\n' "${backups_to_remove[@]}"
-        echo ""
-        print_white "Do you want to remove these old MCP backups? (y/N): "
-        read -r reply
-        echo
-        
-        if [[ $reply =~ ^[Yy]$ ]]; then
-            echo "Removing old MCP backups..."
-            i=5
-            while [ $i -lt ${#backups[@]} ]; do
-                local old_backup="${backups[$i]}"
-                echo "Removing: $(basename "$old_backup")"
-                rm -f "$old_backup"
-                i=$((i + 1))
-            done
-            echo "✓ Old MCP backups removed successfully"
-        else
-            echo "Skipping cleanup of old MCP backups"
-        fi
-    fi
-}
-
 # Function to backup and merge .mcp.json file
 backup_and_merge_mcp_file() {
     local target_project="$1"
@@ -1248,18 +1202,8 @@ backup_and_merge_mcp_file() {
     
     # Backup existing .mcp.json if it exists
     if [ -f "$target_mcp_file" ]; then
-        # Create .claude-mcp-backup directory if it doesn't exist
-        local backup_dir="$target_project/.claude-mcp-backup"
-        if [ ! -d "$backup_dir" ]; then
-            mkdir -p "$backup_dir"
-        fi
-        
-        local backup_file="$backup_dir/.mcp.json.backup.$(date +%Y%m%d_%H%M%S)"
-        if cp "$target_mcp_file" "$backup_file" 2>/dev/null; then
-            echo "  ✓ Backed up existing .mcp.json to $(basename "$backup_file")"
-            
-            # Clean up old backups (keep only 5 most recent)
-            cleanup_old_mcp_backups "$backup_dir"
+        if bash "$clauder_dir/clauder_backup.sh" --project "$target_project" create mcp >/dev/null 2>&1; then
+            echo "  ✓ Backed up existing .mcp.json to .claude-backup"
         else
             echo "  ⚠ Failed to backup existing .mcp.json"
         fi
@@ -1536,7 +1480,7 @@ display_mcp_servers() {
     fi
 }
 
-# Function to copy .claude folder
+# Function to copy .claude folder and apply expansion packs
 copy_claude_folder() {
     # Check if CLAUDER_DIR environment variable is set
     if [[ -z "$CLAUDER_DIR" ]]; then
@@ -1546,8 +1490,11 @@ copy_claude_folder() {
     fi
     
     local source_claude="$CLAUDER_DIR/.claude"
+    local expansion_packs_dir="$CLAUDER_DIR/.claude-expansion-packs"
     local target_project="$1"
     local target_claude="$target_project/.claude"
+    shift
+    local expansions=("$@")
     
     # Check if source .claude exists
     if [ ! -d "$source_claude" ]; then
@@ -1555,6 +1502,12 @@ copy_claude_folder() {
         safe_exit 1
     fi
     
+    # Check if python3 is available (required to apply the configuration)
+    if ! command -v python3 >/dev/null 2>&1; then
+        echo "Error: python3 is required but not installed."
+        safe_exit 1
+    fi
+    
     # Check if target project exists
     check_directory "$target_project"
     
@@ -1573,84 +1526,18 @@ copy_claude_folder() {
         # Check for existing files and prompt for approval
         check_existing_files "$source_claude" "$target_claude"
         if [ $? -ne 0 ]; then
+            # Keep the existing base configuration, but still apply expansion packs
+            apply_claude_configuration "$target_claude" "" "$expansion_packs_dir" "${expansions[@]}"
             return 0
         fi
     fi
     
-    # Copy all files from source .claude to target .claude
+    # Apply the base configuration and all expansion packs in a single pass
     echo "Source directory: $source_claude"
     echo "Target directory: $target_claude"
     echo "Copying .claude files to $target_claude..."
     
-    # Files that need special merging to preserve existing configurations
-    local mergeable_files=(".exclude_security_checks" ".ignore" ".immutable" "preferences.json") # settings.json is not mergeable to ensure working operations upon auto-updates, for custom settings use .claude/settings.local.json instead
-    
-    # Track successful and failed copies
-    local successful_copies=()
-    local failed_copies=()
-    
-    # Copy each file individually to track success/failure
-    while IFS= read -r -d '' source_file; do
-        # Get relative path from source
-        local relative_path="${source_file#$source_claude/}"
-        local target_file="$target_claude/$relative_path"
-        
-        # Create target directory if it doesn't exist
-        local target_dir=$(dirname "$target_file")
-        if [ ! -d "$target_dir" ]; then
-            mkdir -p "$target_dir"
-        fi
-        
-        # Check if this is a mergeable file
-        local filename=$(basename "$relative_path")
-        local should_merge=false
-        
-        for mergeable_file in "${mergeable_files[@]}"; do
-            if [ "$filename" = "$mergeable_file" ]; then
-                should_merge=true
-                break
-            fi
-        done
-        
-        # Handle file copying/merging
-        if [ "$should_merge" = true ] && [ -f "$target_file" ]; then
-            # Merge with existing configuration to preserve custom settings
-            if [[ "$filename" == *.json ]]; then
-                if merge_json_files "$target_file" "$source_file"; then
-                    successful_copies+=("$relative_path (merged)")
-                else
-                    failed_copies+=("$relative_path (merge failed)")
-                fi
-            else
-                if merge_text_files "$target_file" "$source_file"; then
-                    successful_copies+=("$relative_path (merged)")
-                else
-                    failed_copies+=("$relative_path (merge failed)")
-                fi
-            fi
-        else
-            # Copy the file normally (overwrite if it doesn't exist or isn't mergeable)
-            if cp -f "$source_file" "$target_file" 2>/dev/null; then
-                successful_copies+=("$relative_path")
-            else
-                failed_copies+=("$relative_path")
-                echo "Failed to copy: $source_file -> $target_file" >&2
-            fi
-        fi
-    done < <(find "$source_claude" -type f -print0 2>/dev/null)
-    
-    # Display results
-    if [ ${#successful_copies[@]} -gt 0 ]; then
-        echo "Successfully copied files:"
-        printf '  ✓ %s\n' "${successful_copies[@]}"
-    fi
-    
-    if [ ${#failed_copies[@]} -gt 0 ]; then
-        echo "Failed to copy files:"
-        printf '  ✗ %s\n' "${failed_copies[@]}"
-    fi
-    
-    if [ ${#failed_copies[@]} -eq 0 ]; then
+    if apply_claude_configuration "$target_claude" "$source_claude" "$expansion_packs_dir" "${expansions[@]}"; then
         echo "All files copied successfully."
     else
         echo "Some files could not be copied, but continuing with activation..."
@@ -1715,16 +1602,9 @@ main() {
     # Check if we're trying to activate in the clauder directory itself
     check_clauder_directory_activation "$target_path"
     
-    # Copy the .claude folder
-    copy_claude_folder "$target_path"
-    
-    # Apply previously applied expansion packs first
-    apply_previous_expansions "$target_path"
-    
-    # Apply new expansion packs if specified (these will override previous ones)
-    if [ ${#expansions[@]} -gt 0 ]; then
-        apply_expansion_packs "$target_path" "${expansions[@]}"
-    fi
+    # Copy the .claude folder, then previously applied expansion packs,
+    # then new expansion packs if specified (these will override previous ones)
+    copy_claude_folder "$target_path" "${expansions[@]}"
 }
 
 # Run main function with all arguments
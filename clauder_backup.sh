@@ -0,0 +1,527 @@
+#!/bin/bash
+
+# Script to create, list, restore and prune backups of a project's .claude configuration
+#
+# Backups are kept in .claude-backup/ as a content-addressed store:
+#   objects/<id[:2]>/<id>            file contents, stored once (large files in fixed-size chunks)
+#   snapshots/<kind>/<name>.json     one manifest per snapshot: path, size, mtime, mode, object ids
+#
+# Unchanged files are detected from the previous snapshot's size and mtime and reference the
+# objects already stored, so a backup costs time and disk proportional to what changed. An
+# append to a large log or a few rewritten pages of trace.sqlite only store the changed chunks.
+# Old snapshots are pruned automatically, and objects no longer referenced are removed.
+#
+# Kinds: "claude" (the .claude directory, without .claude/.tmp) and "mcp" (.mcp.json)
+#
+# Backups made by earlier versions are listed and restored too: full copies of .claude in
+# .claude-backup/<timestamp>/ and .mcp.json copies in .claude-mcp-backup/.mcp.json.backup.<timestamp>.
+# They count towards the retention of their kind after the store's own snapshots.
+#
+# Retention (environment):
+#   CLAUDER_BACKUP_KEEP           snapshots kept per kind for .claude (default: 10)
+#   CLAUDER_MCP_BACKUP_KEEP       snapshots kept for .mcp.json (default: 5)
+#   CLAUDER_BACKUP_MAX_AGE_DAYS   also drop snapshots older than this (default: 0, disabled)
+# The most recent snapshot of each kind is always kept.
+
+# Colors for output
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+# Function to print colored output
+print_status() {
+    local color=$1
+    local message=$2
+    echo -e "${color}${message}${NC}"
+}
+
+# Function to show usage
+show_usage() {
+    echo "Usage: $0 [--project DIR] <command> [options]"
+    echo ""
+    echo "Commands:"
+    echo "  create [claude|mcp]             Snapshot .claude (default) or .mcp.json"
+    echo "  list [claude|mcp]               List snapshots, newest first"
+    echo "  restore <snapshot> [claude|mcp] Restore a snapshot ('latest' or a name from 'list')"
+    echo "  prune                           Apply the retention policy and remove unused objects"
+    echo ""
+    echo "Options:"
+    echo "  --project DIR                   Project directory (default: current directory)"
+    echo "  -h, --help                      Show this help message"
+    echo ""
+    echo "The current state is snapshotted before a restore, so a restore can be undone."
+}
+
+# Function to run the backup store
+# Usage: run_backup_store <project_dir> <command> [args...]
+run_backup_store() {
+    python3 - "$@" <<'PYTHON_EOF'
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+
+BACKUP_DIR = ".claude-backup"
+LEGACY_MCP_DIR = ".claude-mcp-backup"
+LEGACY_MCP_PREFIX = ".mcp.json.backup."
+CHUNK_SIZE = 1024 * 1024
+KINDS = {"claude": ".claude", "mcp": ".mcp.json"}
+# Regenerated caches and transient SQLite files are not backed up
+EXCLUDED_DIRS = {".tmp", "__pycache__"}
+EXCLUDED_SUFFIXES = ("-shm",)
+
+
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+KEEP = {
+    "claude": max(env_int("CLAUDER_BACKUP_KEEP", 10), 1),
+    "mcp": max(env_int("CLAUDER_MCP_BACKUP_KEEP", 5), 1),
+}
+MAX_AGE_DAYS = env_int("CLAUDER_BACKUP_MAX_AGE_DAYS", 0)
+
+
+def human_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def write_atomic(path, chunks, mode=0o644):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-backup-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class BackupStore:
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.root = os.path.join(project_dir, BACKUP_DIR)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.snapshots_dir = os.path.join(self.root, "snapshots")
+
+    # Objects
+
+    def object_path(self, object_id):
+        return os.path.join(self.objects_dir, object_id[:2], object_id)
+
+    def has_objects(self, object_ids):
+        return all(os.path.exists(self.object_path(object_id)) for object_id in object_ids)
+
+    def store_file(self, path):
+        """Store a file's chunks. Returns (object ids, bytes newly stored)."""
+        object_ids = []
+        stored = 0
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk and object_ids:
+                    break
+                object_id = hashlib.sha256(chunk).hexdigest()
+                object_path = self.object_path(object_id)
+                if not os.path.exists(object_path):
+                    write_atomic(object_path, [chunk], 0o444)
+                    stored += len(chunk)
+                object_ids.append(object_id)
+                if len(chunk) < CHUNK_SIZE:
+                    break
+        return object_ids, stored
+
+    def read_objects(self, object_ids):
+        for object_id in object_ids:
+            with open(self.object_path(object_id), "rb") as f:
+                yield f.read()
+
+    # Snapshots
+
+    def snapshot_names(self, kind):
+        """Snapshot names of a kind, newest first."""
+        directory = os.path.join(self.snapshots_dir, kind)
+        if not os.path.isdir(directory):
+            return []
+        return sorted((n[:-5] for n in os.listdir(directory) if n.endswith(".json")), reverse=True)
+
+    def manifest_path(self, kind, name):
+        return os.path.join(self.snapshots_dir, kind, f"{name}.json")
+
+    def load(self, kind, name):
+        with open(self.manifest_path(kind, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, kind, name, manifest):
+        data = json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+        write_atomic(self.manifest_path(kind, name), [data])
+
+    def resolve(self, kind, name):
+        names = self.snapshot_names(kind)
+        if name == "latest":
+            return names[0] if names else None
+        matches = [n for n in names if n == name] or [n for n in names if n.startswith(name)]
+        return matches[0] if len(matches) == 1 else None
+
+    def legacy_backups(self, kind):
+        """
+        Full-copy backups made before the store existed, newest first:
+        .claude-backup/<timestamp>/ and .claude-mcp-backup/.mcp.json.backup.<timestamp>.
+        """
+        if kind == "claude":
+            if not os.path.isdir(self.root):
+                return []
+            return sorted(
+                (n for n in os.listdir(self.root)
+                 if n.startswith("20") and os.path.isdir(os.path.join(self.root, n))),
+                reverse=True,
+            )
+        directory = os.path.join(self.project_dir, LEGACY_MCP_DIR)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            (n[len(LEGACY_MCP_PREFIX):] for n in os.listdir(directory)
+             if n.startswith(LEGACY_MCP_PREFIX) and os.path.isfile(os.path.join(directory, n))),
+            reverse=True,
+        )
+
+    def legacy_path(self, kind, name):
+        if kind == "claude":
+            return os.path.join(self.root, name)
+        return os.path.join(self.project_dir, LEGACY_MCP_DIR, LEGACY_MCP_PREFIX + name)
+
+
+def scan(project_dir, kind):
+    """Yield (relative path, absolute path, lstat) of the files to back up."""
+    top = os.path.join(project_dir, KINDS[kind])
+    if os.path.isfile(top) or os.path.islink(top):
+        yield KINDS[kind], top, os.lstat(top)
+        return
+    for directory, dirnames, filenames in os.walk(top):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(EXCLUDED_SUFFIXES):
+                continue
+            path = os.path.join(directory, filename)
+            st = os.lstat(path)
+            if stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode):
+                yield os.path.relpath(path, project_dir), path, st
+
+
+def content_key(entry):
+    """What a file entry holds, ignoring its stat data."""
+    return entry.get("objects"), entry.get("link"), entry.get("mode")
+
+
+def same_content(files, other_files):
+    return files.keys() == other_files.keys() and all(
+        content_key(entry) == content_key(other_files[path]) for path, entry in files.items()
+    )
+
+
+def snapshot(store, kind):
+    """
+    Snapshot the current state. Returns (name, manifest, created); when nothing
+    changed since the latest snapshot, that snapshot is returned instead.
+    """
+    names = store.snapshot_names(kind)
+    previous_name = names[0] if names else None
+    previous = store.load(kind, previous_name) if previous_name else None
+    previous_files = previous["files"] if previous else {}
+
+    files = {}
+    stored = 0
+    for relative, path, st in scan(store.project_dir, kind):
+        if stat.S_ISLNK(st.st_mode):
+            files[relative] = {"link": os.readlink(path)}
+            continue
+        old = previous_files.get(relative)
+        if (old and "objects" in old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns
+                and store.has_objects(old["objects"])):
+            object_ids = old["objects"]
+        else:
+            object_ids, written = store.store_file(path)
+            stored += written
+        files[relative] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "mode": stat.S_IMODE(st.st_mode),
+            "objects": object_ids,
+        }
+
+    if previous is not None and same_content(previous["files"], files):
+        if previous["files"] != files:
+            # Same content, new stat data: refresh the stat cache of the latest snapshot
+            previous["files"] = files
+            store.save(kind, previous_name, previous)
+        return previous_name, previous, False
+
+    name = time.strftime("%Y-%m-%d-%H-%M-%S")
+    suffix = 1
+    while os.path.exists(store.manifest_path(kind, name if suffix == 1 else f"{name}-{suffix}")):
+        suffix += 1
+    if suffix > 1:
+        name = f"{name}-{suffix}"
+    manifest = {"kind": kind, "created": time.time(), "stored_bytes": stored, "files": files}
+    store.save(kind, name, manifest)
+    return name, manifest, True
+
+
+def prune(store, protect=()):
+    """Apply the retention policy to every kind, then remove unreferenced objects."""
+    removed = 0
+    now = time.time()
+    for kind in KINDS:
+        for index, name in enumerate(store.snapshot_names(kind)):
+            if index == 0 or name in protect:
+                continue
+            expired = False
+            if MAX_AGE_DAYS > 0:
+                try:
+                    expired = now - store.load(kind, name)["created"] > MAX_AGE_DAYS * 86400
+                except (OSError, ValueError, KeyError):
+                    expired = False
+            if index >= KEEP[kind] or expired:
+                os.unlink(store.manifest_path(kind, name))
+                removed += 1
+
+    # Legacy full copies are older than any snapshot and fill the remaining retention
+    freed = 0
+    for kind in KINDS:
+        kept = len(store.snapshot_names(kind))
+        for name in store.legacy_backups(kind):
+            path = store.legacy_path(kind, name)
+            expired = MAX_AGE_DAYS > 0 and now - os.path.getmtime(path) > MAX_AGE_DAYS * 86400
+            if kept >= KEEP[kind] or expired:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    freed += sum(
+                        os.lstat(os.path.join(directory, f)).st_size
+                        for directory, _, filenames in os.walk(path) for f in filenames
+                    )
+                    shutil.rmtree(path)
+                else:
+                    freed += os.lstat(path).st_size
+                    os.unlink(path)
+                removed += 1
+            else:
+                kept += 1
+    try:
+        os.rmdir(os.path.join(store.project_dir, LEGACY_MCP_DIR))
+    except OSError:
+        pass
+
+    referenced = set()
+    for kind in KINDS:
+        for name in store.snapshot_names(kind):
+            for entry in store.load(kind, name)["files"].values():
+                referenced.update(entry.get("objects", ()))
+
+    if os.path.isdir(store.objects_dir):
+        for prefix in os.listdir(store.objects_dir):
+            directory = os.path.join(store.objects_dir, prefix)
+            for object_id in os.listdir(directory):
+                if object_id not in referenced:
+                    path = os.path.join(directory, object_id)
+                    freed += os.path.getsize(path)
+                    os.unlink(path)
+    return removed, freed
+
+
+def restore(store, kind, name):
+    """Make the project match a snapshot, rewriting only the files that differ."""
+    current_name, current, _ = snapshot(store, kind)
+    target = store.load(kind, name)
+    current_files = current["files"]
+    project_dir = store.project_dir
+
+    written = 0
+    for relative, entry in target["files"].items():
+        path = os.path.join(project_dir, relative)
+        existing = current_files.get(relative)
+        if existing is not None and content_key(existing) == content_key(entry):
+            continue
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.islink(path) or ("link" in entry and os.path.lexists(path)):
+            os.unlink(path)
+        if "link" in entry:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.symlink(entry["link"], path)
+        else:
+            write_atomic(path, store.read_objects(entry["objects"]), entry["mode"])
+            os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        written += 1
+
+    removed = 0
+    for relative in current_files:
+        if relative not in target["files"]:
+            path = os.path.join(project_dir, relative)
+            if os.path.lexists(path):
+                os.unlink(path)
+                removed += 1
+    return current_name, written, removed
+
+
+def restore_legacy(store, kind, name):
+    """Restore a full-copy backup from before the store existed."""
+    current_name = None
+    target = os.path.join(store.project_dir, KINDS[kind])
+    if os.path.lexists(target):
+        current_name, _, _ = snapshot(store, kind)
+    if kind == "claude":
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(store.legacy_path(kind, name), target, symlinks=True)
+    else:
+        with open(store.legacy_path(kind, name), "rb") as f:
+            write_atomic(target, [f.read()])
+    return current_name
+
+
+def print_list(store, kinds):
+    for kind in kinds:
+        names = store.snapshot_names(kind)
+        print(f"{KINDS[kind]} snapshots ({len(names)}, keeping {KEEP[kind]}):")
+        if not names:
+            print("  none")
+        for name in names:
+            manifest = store.load(kind, name)
+            files = manifest["files"]
+            size = sum(entry.get("size", 0) for entry in files.values())
+            print(f"  {name}  {len(files):>5} files  {human_size(size):>9}  "
+                  f"{human_size(manifest.get('stored_bytes', 0)):>9} new")
+        legacy = store.legacy_backups(kind)
+        if legacy:
+            print(f"{KINDS[kind]} full-copy backups from earlier versions ({len(legacy)}, counted in the retention above):")
+            for name in legacy:
+                print(f"  {name}")
+    if os.path.isdir(store.objects_dir):
+        total = sum(
+            os.path.getsize(os.path.join(directory, f))
+            for directory, _, filenames in os.walk(store.objects_dir) for f in filenames
+        )
+        print(f"Object store: {human_size(total)}")
+
+
+def main():
+    project_dir = os.path.abspath(sys.argv[1])
+    command = sys.argv[2]
+    args = sys.argv[3:]
+    store = BackupStore(project_dir)
+
+    def kind_arg(index):
+        kind = args[index] if len(args) > index else "claude"
+        if kind not in KINDS:
+            raise ValueError(f"Unknown backup kind: {kind} (expected {' or '.join(KINDS)})")
+        return kind
+
+    if command == "list":
+        kinds = [kind_arg(0)] if args else list(KINDS)
+        print_list(store, kinds)
+        return 0
+
+    os.makedirs(store.root, exist_ok=True)
+    with open(os.path.join(store.root, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        if command == "create":
+            kind = kind_arg(0)
+            if not os.path.lexists(os.path.join(project_dir, KINDS[kind])):
+                print(f"Nothing to back up: no {KINDS[kind]} in {project_dir}")
+                return 0
+            name, manifest, created = snapshot(store, kind)
+            if created:
+                print(f"Backup location: {BACKUP_DIR}/snapshots/{kind}/{name}.json "
+                      f"({len(manifest['files'])} files, {human_size(manifest['stored_bytes'])} new)")
+                prune(store, protect={name})
+            else:
+                print(f"No changes since backup {name}")
+            return 0
+
+        if command == "restore":
+            if not args:
+                raise ValueError("Usage: restore <snapshot> [claude|mcp]")
+            kind = kind_arg(1)
+            name = store.resolve(kind, args[0])
+            if name is not None:
+                saved, written, removed = restore(store, kind, name)
+                print(f"Restored {KINDS[kind]} from backup {name} "
+                      f"({written} file(s) written, {removed} removed)")
+            elif args[0] in store.legacy_backups(kind):
+                saved = restore_legacy(store, kind, args[0])
+                print(f"Restored {KINDS[kind]} from full-copy backup {args[0]}")
+            else:
+                raise ValueError(f"Unknown or ambiguous backup: {args[0]}")
+            if saved is not None:
+                print(f"Previous state saved as backup {saved}")
+            prune(store, protect={saved})
+            return 0
+
+        if command == "prune":
+            removed, freed = prune(store)
+            print(f"Removed {removed} snapshot(s), freed {human_size(freed)}")
+            return 0
+
+    raise ValueError(f"Unknown command: {command}")
+
+
+try:
+    sys.exit(main())
+except (OSError, ValueError, KeyError) as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
+PYTHON_EOF
+}
+
+# Main function
+main() {
+    local project_dir="$(pwd)"
+
+    while [[ $# -gt 0 ]]; do
+        case $1 in
+            --project)
+                project_dir="$2"
+                shift 2
+                ;;
+            -h|--help)
+                show_usage
+                return 0
+                ;;
+            *)
+                break
+                ;;
+        esac
+    done
+
+    if [[ $# -eq 0 ]]; then
+        show_usage
+        return 1
+    fi
+
+    if [[ ! -d "$project_dir" ]]; then
+        print_status $RED "Error: Project directory '$project_dir' does not exist"
+        return 1
+    fi
+
+    if ! command -v python3 >/dev/null 2>&1; then
+        print_status $RED "Error: python3 is required but not installed."
+        return 1
+    fi
+
+    run_backup_store "$project_dir" "$@"
+}
+
+main "$@"
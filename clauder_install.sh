@@ -92,6 +92,7 @@ export CLAUDER_DIR="$project_abs_path"
 alias clauder_activate='bash "$activate_script"'
 alias clauder_security_check='bash "$security_script"'
 alias clauder_trace='bash "$project_abs_path/clauder_trace.sh"'
+alias clauder_backup='bash "$project_abs_path/clauder_backup.sh"'
 alias clauder='bash "$project_abs_path/clauder.sh"'
 EOF
     
@@ -103,6 +104,7 @@ EOF
     print_status $DARK_GRAY "   alias clauder_activate='bash $activate_script'"
     print_status $DARK_GRAY "   alias clauder_security_check='bash $security_script'"
     print_status $DARK_GRAY "   alias clauder_trace='bash $project_abs_path/clauder_trace.sh'"
+    print_status $DARK_GRAY "   alias clauder_backup='bash $project_abs_path/clauder_backup.sh'"
     print_status $DARK_GRAY "   alias clauder='bash $project_abs_path/clauder.sh'"
     
     return 0
@@ -29,6 +29,55 @@ check_git_repo() {
     fi
 }
 
+# Function to get the update fetch cache file for a project (empty if not activated)
+fetch_cache_file() {
+    local original_dir="$1"
+    if [[ -d "$original_dir/.claude" ]]; then
+        echo "$original_dir/.claude/.tmp/preflight/update-fetch"
+    fi
+}
+
+# Function to check if the last successful fetch is younger than CLAUDER_UPDATE_CHECK_TTL
+fetch_is_fresh() {
+    local cache_file="$1"
+    local ttl="${CLAUDER_UPDATE_CHECK_TTL:-0}"
+    
+    if [[ -z "$cache_file" ]] || [[ "$ttl" -le 0 ]] || [[ ! -f "$cache_file" ]]; then
+        return 1
+    fi
+    
+    local fetched_at=$(head -n 1 "$cache_file" 2>/dev/null)
+    if [[ ! "$fetched_at" =~ ^[0-9]+$ ]]; then
+        return 1
+    fi
+    
+    [[ $(( $(date +%s) - fetched_at )) -lt "$ttl" ]]
+}
+
+# Function to fetch remote changes, skipped if fetched within the TTL
+fetch_updates() {
+    local clauder_dir="$1"
+    local original_dir="$2"
+    local cache_file=$(fetch_cache_file "$original_dir")
+    
+    # Reuse the result of a fetch already done by clauder's preflight
+    if [[ -n "$CLAUDER_UPDATE_FETCH_STATUS" && -f "$CLAUDER_UPDATE_FETCH_STATUS" ]]; then
+        [[ "$(cat "$CLAUDER_UPDATE_FETCH_STATUS")" == "ok" ]]
+        return $?
+    fi
+    
+    if fetch_is_fresh "$cache_file"; then
+        return 0
+    fi
+    
+    git -C "$clauder_dir" fetch origin main > /dev/null 2>&1 || return 1
+    
+    if [[ -n "$cache_file" ]] && mkdir -p "$(dirname "$cache_file")" 2>/dev/null; then
+        date +%s > "$cache_file"
+    fi
+    return 0
+}
+
 # Function to check for updates
 check_for_updates() {
     local clauder_dir="$1"
@@ -51,7 +100,7 @@ check_for_updates() {
     print_status $DARK_GRAY "Clauder directory: $clauder_dir"
     print_status $DARK_GRAY "Project directory: $original_dir"
     
-    git fetch origin main > /dev/null 2>&1 || {
+    fetch_updates "$clauder_dir" "$original_dir" || {
         print_status $RED "❌ Failed to fetch updates from remote repository"
         cd "$original_dir"
         eval "$update_needed_var=false"
@@ -250,6 +299,18 @@ main() {
     local original_dir="$(pwd)"
     local clauder_dir="${CLAUDER_DIR:-$(dirname "$(realpath "$0")")}"
     
+    # Only fetch remote changes (used by clauder to prefetch in the background)
+    if [[ "$1" == "--prefetch" ]]; then
+        local fetch_status="failed"
+        if check_git_repo "$clauder_dir" && fetch_updates "$clauder_dir" "$original_dir"; then
+            fetch_status="ok"
+        fi
+        if [[ -n "$CLAUDER_UPDATE_FETCH_STATUS" ]]; then
+            echo "$fetch_status" > "$CLAUDER_UPDATE_FETCH_STATUS"
+        fi
+        return 0
+    fi
+    
     # Check for updates and get the result
     local update_needed=false
     check_for_updates "$clauder_dir" "$original_dir" "update_needed"